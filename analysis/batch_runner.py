@@ -0,0 +1,99 @@
+"""
+Batch beam analysis : read many BeamModel definitions from one file, analyse them
+across a process pool and write one result line per beam (JSON Lines)
+"""
+
+import sys
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+
+from absl import app, flags
+from absl.flags import FLAGS
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)  # Add "strd" to sys.path
+
+from beam_analysis import load_models, BeamAnalysis
+from result_export import write_chunks
+
+## FLAGS definition
+flags.DEFINE_string("input", None, "beam models, .json, .jsonl or .yaml")
+flags.DEFINE_string("output", "beam_results.jsonl", "results, one JSON line per beam")
+flags.DEFINE_integer("workers", None, "number of processes, default = CPU count")
+flags.DEFINE_integer("chunksize", 16, "beams sent to a worker at a time")
+flags.DEFINE_string(
+    "diagrams", None, "V, M, delta of every beam, .csv, .npz or .parquet"
+)
+flags.DEFINE_integer("numS", 101, "diagram points per span")
+
+
+def analyse(model):
+    result = model.analyse()
+    dy, R, F = result.case(model.name)
+    return {
+        "name": model.name,
+        "dy": dy[:, 0].tolist(),  # m, radian
+        "R": (R[:, 0] * 1e-3).tolist(),  # kN, kN-m
+        "F": [(f[:, 0] * 1e-3).tolist() for f in F],  # kN, kN-m
+    }
+
+
+def diagrams(model, numS=101):
+    # One chunk per beam : all spans of the beam, with its name
+    analysis = BeamAnalysis.from_model(model)
+    analysis.calculators_force()
+    spans = list(
+        analysis.coords.diagram_chunks(
+            analysis.stretch, analysis.loads, analysis.F, analysis.dy, analysis.QF, numS
+        )
+    )
+    chunk = {key: np.concatenate([span[key] for span in spans]) for key in spans[0]}
+    return {"beam": np.full(len(chunk["x"]), model.name), **chunk}
+
+
+def run_diagrams(models, output, workers=None, chunksize=16, numS=101):
+    # Chunks are written as the workers return them
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = executor.map(partial(diagrams, numS=numS), models, chunksize=chunksize)
+        return write_chunks(chunks, output)
+
+
+def run(models, output, workers=None, chunksize=16):
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(
+        output, "w", encoding="utf-8"
+    ) as f:
+        for result in executor.map(analyse, models, chunksize=chunksize):
+            f.write(json.dumps(result) + "\n")
+
+
+def main(_args):
+    models = load_models(FLAGS.input)
+    print(f"[INFO] {len(models)} beams from {FLAGS.input}")
+    run(models, FLAGS.output, FLAGS.workers, FLAGS.chunksize)
+    print(f"[INFO] Results : {FLAGS.output}")
+
+    if FLAGS.diagrams:
+        rows = run_diagrams(
+            models, FLAGS.diagrams, FLAGS.workers, FLAGS.chunksize, FLAGS.numS
+        )
+        print(f"[INFO] Diagrams : {FLAGS.diagrams}, {rows} rows")
+
+
+if __name__ == "__main__":
+    flags.mark_flag_as_required("input")
+    app.run(main)
+
+"""
+How to used?
+-Beam file : list of models, see BeamModel.from_dict for keys and units
+    [{"name": "B1", "E": 200, "I": 1.38e-4, "spans": [4, 4], "supports": [2, 2, 2],
+      "loads": [[{"type": "q", "value": 10, "a": 0, "l": 4}], []]}, ...]
+
+-Run script
+    % python analysis/batch_runner.py --input=beams.json --output=results.jsonl --workers=8
+    % python analysis/batch_runner.py --input=beams.json --diagrams=diagrams.npz --numS=201
+"""
@@ -8,7 +8,10 @@ https://www.youtube.com/watch?v=hCmXwMQWafk&list=LL&index=6&t=3642s
 
 import sys
 import os
+import json
 import numpy as np
+from scipy import interpolate, linalg, sparse
+from tabulate import tabulate
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -21,6 +24,7 @@ from app.utils import (
     xi_coordinate,
 )
 from plot import Plot
+from result_export import write_chunks
 
 np.set_printoptions(precision=3)
 
@@ -34,20 +38,217 @@ class BeamB:
         I: Moment of inertia of the cross-section
         L: Span length
         k: Stiffness matrix of the span
+        m: Mass per unit length, kg/m (modal analysis only)
     """
 
-    def __init__(self, E, I, L):
+    def __init__(self, E, I, L, k=None, m=0.0):
         self.E = E
         self.I = I
         self.L = L
-        self.k = (E * I / L**3) * np.array(
+        self.m = m
+        self.k = BeamElements.stiffness(E, I, L)[0] if k is None else k
+
+    @property
+    def mass(self):
+        # Consistent mass matrix of the span
+        return BeamElements.consistent_mass(self.m, self.L)[0]
+
+
+class BeamElements:
+    """Stack of Bernoulli Beam elements
+    Attributes:
+        E, I, L, m: (n,) arrays
+        k: (n, 4, 4) stiffness matrices of all spans
+    Behaves as a list of BeamB : elements[i].k, elements[i].L, len(elements)
+    """
+
+    # (E, I, L) -> 4x4 k, repeated span types are computed once
+    cache = {}
+    MAX_CACHE = 4096
+
+    def __init__(self, E, I, L, m=0.0):
+        self.E, self.I, self.L, self.m = (
+            np.array(v, dtype=float) for v in np.broadcast_arrays(E, I, L, m)
+        )
+        self.k = self.stiffness(self.E, self.I, self.L)
+
+    @classmethod
+    def stiffness(cls, E, I, L):
+        """
+        (n, 4, 4) element stiffness, one vectorized expression for the span
+        types not yet in the cache
+        """
+        keys = np.column_stack(np.broadcast_arrays(E, I, L)).astype(float)
+        types, inverse = np.unique(keys, axis=0, return_inverse=True)
+
+        missing = [i for i, key in enumerate(map(tuple, types)) if key not in cls.cache]
+        if missing:
+            E, I, L = types[missing].T
+            c = E * I / L**3
+            k = c[:, None, None] * np.stack(
+                [
+                    [np.full_like(L, 12.0), 6 * L, np.full_like(L, -12), 6 * L],
+                    [6 * L, 4 * L**2, -6 * L, 2 * L**2],
+                    [np.full_like(L, -12), -6 * L, np.full_like(L, 12), -6 * L],
+                    [6 * L, 2 * L**2, -6 * L, 4 * L**2],
+                ]
+            ).transpose(2, 0, 1)
+            if len(cls.cache) + len(missing) > cls.MAX_CACHE:
+                cls.cache.clear()
+            cls.cache.update(zip(map(tuple, types[missing]), k))
+
+        templates = np.array([cls.cache[key] for key in map(tuple, types)])
+        return templates[inverse.ravel()]
+
+    @staticmethod
+    def consistent_mass(m, L):
+        """
+        (n, 4, 4) consistent mass matrices, same Hermite shape functions as k
+        m : mass per unit length, kg/m
+        """
+        m, L = (
+            np.atleast_1d(np.asarray(v, dtype=float)) for v in np.broadcast_arrays(m, L)
+        )
+        c = m * L / 420
+        return c[:, None, None] * np.stack(
             [
-                [12.0, 6 * L, -12, 6 * L],
-                [6 * L, 4 * L**2, -6 * L, 2 * L**2],
-                [-12, -6 * L, 12, -6 * L],
-                [6 * L, 2 * L**2, -6 * L, 4 * L**2],
+                [np.full_like(L, 156.0), 22 * L, np.full_like(L, 54.0), -13 * L],
+                [22 * L, 4 * L**2, 13 * L, -3 * L**2],
+                [np.full_like(L, 54.0), 13 * L, np.full_like(L, 156.0), -22 * L],
+                [-13 * L, -3 * L**2, -22 * L, 4 * L**2],
             ]
+        ).transpose(2, 0, 1)
+
+    @property
+    def mass(self):
+        return self.consistent_mass(self.m, self.L)
+
+    @classmethod
+    def from_elements(cls, elements):
+        # Any list of elements with E, I, L, k attributes
+        if isinstance(elements, cls):
+            return elements
+        stack = cls.__new__(cls)
+        stack.E = np.array([element.E for element in elements], dtype=float)
+        stack.I = np.array([element.I for element in elements], dtype=float)
+        stack.L = np.array([element.L for element in elements], dtype=float)
+        stack.m = np.array(
+            [getattr(element, "m", 0.0) for element in elements], dtype=float
         )
+        stack.k = np.array([element.k for element in elements]).reshape(-1, 4, 4)
+        return stack
+
+    def __len__(self):
+        return len(self.L)
+
+    def __getitem__(self, i):
+        return BeamB(self.E[i], self.I[i], self.L[i], self.k[i].copy(), self.m[i])
+
+    def __setitem__(self, i, element):
+        self.E[i], self.I[i], self.L[i] = element.E, element.I, element.L
+        self.m[i] = getattr(element, "m", 0.0)
+        self.k[i] = element.k
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class TaperedBeamB(BeamB):
+    """Tapered Bernoulli Beam
+    Attributes:
+        I1, I2: Moment of inertia at the left / right end
+        n: I(x) = (I1^(1/n) + (I2^(1/n) - I1^(1/n)) x/L)^n
+           1 = linear I, 2 ~ flange area dominated, 3 ~ web dominated depth taper
+        S: 2x2 end rotational stiffness, [M1, M2] = [S][φ1, φ2]
+    I is the inertia at midspan, for reports
+    """
+
+    GAUSS_POINTS = 8
+
+    def __init__(self, E, I1, I2, L, n=3, m=0.0):
+        self.I1, self.I2, self.n = I1, I2, n
+        self.S = self.rotational_stiffness(E, I1, I2, L, n)[0]
+        T = self.chord(L)[0]
+        super().__init__(E, self.profile(I1, I2, n, 0.5), L, T.T @ self.S @ T, m)
+
+    @staticmethod
+    def profile(I1, I2, n, xi):
+        # I at xi = x/L
+        return (I1 ** (1 / n) + (I2 ** (1 / n) - I1 ** (1 / n)) * xi) ** n
+
+    def inertia(self, x):
+        return self.profile(self.I1, self.I2, self.n, np.asarray(x) / self.L)
+
+    @classmethod
+    def gauss(cls):
+        # Gauss-Legendre points and weights on (0, 1)
+        t, w = np.polynomial.legendre.leggauss(cls.GAUSS_POINTS)
+        return (t + 1) / 2, w / 2
+
+    @staticmethod
+    def chord(L):
+        """
+        (n, 2, 4) end rotations relative to the chord, φ = [T][d1, θ1, d2, θ2]
+        """
+        L = np.atleast_1d(np.asarray(L, dtype=float))
+        T = np.zeros((len(L), 2, 4))
+        T[:, :, 0] = 1 / L[:, None]
+        T[:, :, 2] = -1 / L[:, None]
+        T[:, 0, 1] = T[:, 1, 3] = 1
+        return T
+
+    @classmethod
+    def rotational_stiffness(cls, E, I1, I2, L, n=3):
+        """
+        (n, 2, 2) inverse of the end flexibility f_ij = ∫ m_i m_j / EI dx of the
+        simply supported span, m1 = x/L - 1, m2 = x/L, all elements at once
+        """
+        E, I1, I2, L, n = (
+            np.atleast_1d(np.asarray(v, dtype=float))
+            for v in np.broadcast_arrays(E, I1, I2, L, n)
+        )
+        xi, w = cls.gauss()
+        EI = E[:, None] * cls.profile(I1[:, None], I2[:, None], n[:, None], xi)
+        m = np.stack([xi - 1, xi])  # (2, g)
+        f = L[:, None, None] * np.einsum("ig,jg,ng->nij", m, m, w / EI)
+        return np.linalg.inv(f)
+
+    @classmethod
+    def stiffness(cls, E, I1, I2, L, n=3):
+        # (n, 4, 4) element stiffness, k = Tt S T
+        T = cls.chord(np.broadcast_arrays(E, I1, I2, L, n)[3])
+        S = cls.rotational_stiffness(E, I1, I2, L, n)
+        return T.transpose(0, 2, 1) @ S @ T
+
+    def fixed_end_forces(self, loads):
+        """
+        Equivalent nodal reactions [V1, M1, V2, M2] of the span loads, (4,)
+        M1, M2 = -[S] φ0, φ0 : end rotations of the simply supported span by
+        Gauss quadrature on every interval between load breakpoints
+        """
+        L = self.L
+        QF = np.zeros(4)
+        for load in loads:
+            QF += load.equivalent_nodal_reactions(L)[:, 0]
+        if not loads:
+            return QF
+
+        # Simply supported reactions do not depend on EI
+        V1s = QF[0] - (QF[1] + QF[3]) / L
+        V2s = QF[2] + (QF[1] + QF[3]) / L
+
+        x = np.unique(load_breakpoints(loads, L))
+        h = np.diff(x)
+        xi, w = self.gauss()
+        xg = x[:-1, None] + h[:, None] * xi  # (intervals, g)
+        wg = h[:, None] * w
+
+        M0 = sum(load.bending_moment(xg, L) for load in loads)
+        c = M0 * wg / (self.E * self.inertia(xg))
+        φ0 = np.array([(c * (xg / L - 1)).sum(), (c * xg / L).sum()])
+
+        M1, M2 = -self.S @ φ0
+        return np.array([V1s + (M1 + M2) / L, M1, V2s - (M1 + M2) / L, M2])
 
 
 class Load:
@@ -61,6 +262,7 @@ class Load:
             0: "Point Load",
             1: "Distributed Load",
             2: "Concentrated Moment",
+            3: "Linearly Varying Load",
         }
         print(descriptions.get(self.load_type, "Undefined"))
 
@@ -73,6 +275,10 @@ class PointLoad(Load):
         self.P = P
         self.a = a
 
+    @property
+    def value(self):
+        return self.P
+
     def __str__(self):
         return f"Point Load\n   Value: {self.P} N\n   Position: {self.a} m"
 
@@ -87,15 +293,21 @@ class PointLoad(Load):
             ]
         )
 
+    def scaled(self, factor):
+        return PointLoad(factor * self.P, self.a)
+
     def shear_force(self, x, L):
-        return -self.P if self.a < x <= L else 0
+        # x : scalar or np.array of section positions
+        x = np.asarray(x, dtype=float)
+        return np.where((self.a < x) & (x <= L), -self.P, 0.0)
 
     def bending_moment(self, x, L):
-        if 0 <= x < self.a:
-            return (1 - self.a / L) * self.P * x
-        elif x <= L:
-            return self.a * self.P * (1 - x / L)
-        return 0
+        x = np.asarray(x, dtype=float)
+        return np.select(
+            [(0 <= x) & (x < self.a), x <= L],
+            [(1 - self.a / L) * self.P * x, self.a * self.P * (1 - x / L)],
+            0.0,
+        )
 
 
 class DistributedLoad(Load):
@@ -107,6 +319,10 @@ class DistributedLoad(Load):
         self.a = a
         self.l = l
 
+    @property
+    def value(self):
+        return self.q
+
     def __str__(self):
         return f"Distributed Load\n  Value: {self.q} N/m\n  From: {self.a} m to {self.a + self.l} m"
 
@@ -131,7 +347,7 @@ class DistributedLoad(Load):
                 [
                     1
                     - a**3 / L**4 * (2 * L - a)
-                    - b / L**4 * (2 * L**3 - 2 * b**2 * L + a**3)
+                    - b / L**4 * (2 * L**3 - 2 * b**2 * L + b**3)
                 ],
                 [
                     -L
@@ -145,23 +361,23 @@ class DistributedLoad(Load):
             ]
         )
 
+    def scaled(self, factor):
+        return DistributedLoad(factor * self.q, self.a, self.l)
+
     def shear_force(self, x, L):
-        if self.a <= x < self.a + self.l:
-            return -self.q * (x - self.a)
-        elif x > self.a + self.l:
-            return -self.q * self.l
-        return 0
+        # x : scalar or np.array of section positions
+        x = np.asarray(x, dtype=float)
+        return -self.q * np.clip(x - self.a, 0, self.l)
 
     def bending_moment(self, x, L):
+        x = np.asarray(x, dtype=float)
         V1 = self.q * self.l / L * (L - self.a - self.l / 2)
         V2 = self.q * self.l - V1
-        if 0 <= x < self.a:
-            return V1 * x
-        elif x <= self.a + self.l:
-            return V1 * x - 0.5 * self.q * (x - self.a) ** 2
-        elif x <= L:
-            return V2 * (L - x)
-        return 0
+        return np.select(
+            [(0 <= x) & (x < self.a), x <= self.a + self.l, x <= L],
+            [V1 * x, V1 * x - 0.5 * self.q * (x - self.a) ** 2, V2 * (L - x)],
+            0.0,
+        )
 
 
 class ConcentratedMoment(Load):
@@ -172,32 +388,221 @@ class ConcentratedMoment(Load):
         self.M = M
         self.a = a
 
+    @property
+    def value(self):
+        return self.M
+
     def __str__(self):
         return f"Concentrated Moment\n   Value: {self.M} Nm\n   Position: {self.a} m"
 
     def equivalent_nodal_reactions(self, L):
+        # Reactions to a counterclockwise M, same sign as bending_moment
         a, b = self.a, L - self.a
         return (self.M / L**2) * np.array(
             [
-                [-6 * a * b / L],
-                [b * (b - 2 * a)],
                 [6 * a * b / L],
-                [a * (a - 2 * b)],
+                [-b * (b - 2 * a)],
+                [-6 * a * b / L],
+                [-a * (a - 2 * b)],
+            ]
+        )
+
+    def scaled(self, factor):
+        return ConcentratedMoment(factor * self.M, self.a)
+
+    def shear_force(self, x, L):
+        return np.zeros(np.shape(x))
+
+    def bending_moment(self, x, L):
+        # x : scalar or np.array of section positions
+        x = np.asarray(x, dtype=float)
+        return np.select(
+            [(0 <= x) & (x < self.a), (self.a < x) & (x <= L)],
+            [self.M / L * x, self.M * (x / L - 1)],
+            0.0,
+        )
+
+
+class LinearlyVaryingLoad(Load):
+    """Defines a trapezoidal / triangular distributed load.
+    q1 at x = a varying linearly to q2 at x = a + l, N/m, Down+
+    """
+
+    def __init__(self, q1=0, q2=0, a=0, l=0):
+        super().__init__(3)
+        self.q1 = q1
+        self.q2 = q2
+        self.a = a
+        self.l = l
+
+    @property
+    def value(self):
+        return self.q1
+
+    def __str__(self):
+        return f"Linearly Varying Load\n  Value: {self.q1} to {self.q2} N/m\n  From: {self.a} m to {self.a + self.l} m"
+
+    def slope(self):
+        # dq/dx, 0 for zero length loads
+        l = np.asarray(self.l, dtype=float)
+        return np.divide(
+            np.subtract(self.q2, self.q1),
+            l,
+            out=np.zeros(np.broadcast(self.q1, self.q2, l).shape),
+            where=l > 0,
+        )
+
+    def load_moments(self):
+        """
+        Q_k = ∫ q(s) s^k ds over the loaded length, k = 0..3
+        q(s) = α + β s, S_k = ((a + l)^(k+1) - a^(k+1)) / (k+1)
+        """
+        a, l = self.a, self.l
+        β = self.slope()
+        α = self.q1 - β * a
+        S = [((a + l) ** (k + 1) - a ** (k + 1)) / (k + 1) for k in range(5)]
+        return [α * S[k] + β * S[k + 1] for k in range(4)]
+
+    def equivalent_nodal_reactions(self, L):
+        # ∫ q(s) f(s) ds with the fixed-end reactions f of a unit point load at s
+        Q0, Q1, Q2, Q3 = self.load_moments()
+        return np.array(
+            [
+                [(L**3 * Q0 - 3 * L * Q2 + 2 * Q3) / L**3],
+                [(L**2 * Q1 - 2 * L * Q2 + Q3) / L**2],
+                [(3 * L * Q2 - 2 * Q3) / L**3],
+                [(Q3 - L * Q2) / L**2],
             ]
         )
 
+    def scaled(self, factor):
+        return LinearlyVaryingLoad(factor * self.q1, factor * self.q2, self.a, self.l)
+
     def shear_force(self, x, L):
-        return 0
+        # x : scalar or np.array of section positions
+        t = np.clip(np.asarray(x, dtype=float) - self.a, 0, self.l)
+        return -(self.q1 * t + 0.5 * self.slope() * t**2)
 
     def bending_moment(self, x, L):
-        if 0 <= x < self.a:
-            return self.M / L * x
-        elif self.a < x <= L:
-            return self.M * (x / L - 1)
-        return 0
+        x = np.asarray(x, dtype=float)
+        Q0, Q1, _, _ = self.load_moments()
+        V1 = Q0 - Q1 / L  # simply supported left reaction
+
+        # Moment of the load between a and x about the section
+        y = x - self.a
+        t = np.clip(y, 0, self.l)
+        Mq = self.q1 * (y * t - t**2 / 2) + self.slope() * (y * t**2 / 2 - t**3 / 3)
+        return np.where((0 <= x) & (x <= L), V1 * x - Mq, 0.0)
+
+
+class LoadTable:
+    """Columnar loads of a whole beam
+    Attributes (np.array, one row per load):
+        type: 0 = Point Load, 1 = Distributed Load, 2 = Concentrated Moment,
+              3 = Linearly Varying Load
+        span: stretch index
+        value: P (N), q (N/m), M (N-m) or q1 (N/m)
+        a: position / start of the load from the left end of the span, m
+        l: length of distributed load, m (0 for the others)
+        value2: q2 (N/m) of linearly varying loads (0 for the others)
+    """
+
+    TYPES = {
+        0: PointLoad,
+        1: DistributedLoad,
+        2: ConcentratedMoment,
+        3: LinearlyVaryingLoad,
+    }
+
+    def __init__(self, type, span, value, a, l=0, value2=0):
+        self.type, self.span, self.value, self.a, self.l, self.value2 = (
+            np.broadcast_arrays(
+                np.asarray(type, dtype=int),
+                np.asarray(span, dtype=int),
+                np.asarray(value, dtype=float),
+                np.asarray(a, dtype=float),
+                np.asarray(l, dtype=float),
+                np.asarray(value2, dtype=float),
+            )
+        )
+
+    @classmethod
+    def build(cls, type, value, a, l, value2):
+        # Load object of one type, scalars or arrays
+        if type == 1:
+            return DistributedLoad(value, a, l)
+        if type == 3:
+            return LinearlyVaryingLoad(value, value2, a, l)
+        return cls.TYPES[type](value, a)
+
+    @classmethod
+    def from_loads(cls, loads, spans=None):
+        """
+        loads : list (per stretch) of PointLoad/DistributedLoad/ConcentratedMoment
+        spans : only these stretch indices
+        """
+        spans = range(len(loads)) if spans is None else spans
+        rows = [
+            (
+                load.load_type,
+                i,
+                load.value,
+                load.a,
+                getattr(load, "l", 0.0),
+                getattr(load, "q2", 0.0),
+            )
+            for i in spans
+            for load in loads[i]
+        ]
+        if not rows:
+            return cls([], [], [], [], [], [])
+        return cls(*zip(*rows))
+
+    def __len__(self):
+        return len(self.type)
+
+    def to_loads(self, n):
+        # Back to load objects per stretch, for diagrams
+        loads = [[] for _ in range(n)]
+        for type, span, value, a, l, value2 in zip(
+            self.type, self.span, self.value, self.a, self.l, self.value2
+        ):
+            loads[span].append(self.build(type, value, a, l, value2))
+        return loads
+
+    def fixed_end_forces(self, L):
+        """
+        L : span lengths (n,)
+        Equivalent nodal reactions of every stretch, (n, 4), one vectorized pass
+        per load type, summed per stretch with np.add.at
+        """
+        L = np.asarray(L, dtype=float)
+        forces = np.zeros((len(L), 4))
+        for type in self.TYPES:
+            rows = self.type == type
+            if not rows.any():
+                continue
+            span = self.span[rows]
+            load = self.build(
+                type, self.value[rows], self.a[rows], self.l[rows], self.value2[rows]
+            )
+            fef = load.equivalent_nodal_reactions(L[span])  # (4, 1, m)
+            np.add.at(forces, span, fef[:, 0, :].T)
+        return forces
 
 
 class DisplacementReactionAssembly:
+    # Free (unknown) DOFs per support type : [dy, θ]
+    # 0 = fixed, 1 = vertical scroll, 2 = pin, 3 = free
+    SUPPORT_FREE_DOFS = np.array(
+        [
+            [False, False],
+            [True, False],
+            [False, True],
+            [True, True],
+        ]
+    )
+
     def __init__(self, spans, supports, elements, loads):
         self.spans = spans
         self.supports = supports
@@ -205,123 +610,96 @@ class DisplacementReactionAssembly:
         self.loads = loads
         self.nodes = len(elements) + 1
 
-    def assemble_nodal_displacement(self):
+    def dof_masks(self):
         """
-        Assembly displacement matrix : di = ['d1y', 'θ1', 'd2y', 'θ2', 'd3y', 'θ3',...]
+        Boolean masks over d = [d1y, θ1, d2y, θ2, d3y, θ3, ...]
+        free : unknown displacement, known (external) force
+        fixed : known displacement == 0, unknown reaction
         """
-        displacement = []
-        for i, support in enumerate(self.supports):
-            if support == 0:
-                displacement.extend([0, 0])
-            elif support == 1:
-                displacement.extend([f"d{i+1}", 0])
-            elif support == 2:
-                displacement.extend([0, f"θ{i+1}"])
-            elif support == 3:
-                displacement.extend([f"d{i+1}", f"θ{i+1}"])
-        return displacement
+        supports = np.asarray(self.supports, dtype=int)
+        free = self.SUPPORT_FREE_DOFS[supports].ravel()
+        return free, ~free
 
     def assemble_nodal_reactions(self, initial_reactions):
         """
-        Assembly reaction matrix : R = ['F1y', 'M1', 'F2y', 'M2', 'F3y', 'M3',...]
-        """
-        reactions = []
-        for i, support in enumerate(self.supports):
-            if support == 0:
-                reactions.extend([f"F{i+1}", f"M{i+1}"])
-            elif support == 1:
-                reactions.extend([0, f"M{i+1}"])
-            elif support == 2:
-                reactions.extend([f"F{i+1}", 0])
-            elif support == 3:
-                reactions.extend([0, 0])
-        if initial_reactions:
-            for i in range(len(reactions)):
-                if initial_reactions[i]:
-                    reactions[i] = initial_reactions[i]
+        Nodal external force vector : R0 = [F1y, M1, F2y, M2, F3y, M3, ...]
+        """
+        reactions = np.zeros((2 * self.nodes, 1))
+        if initial_reactions is not None and len(initial_reactions):
+            reactions[:, 0] = np.asarray(initial_reactions, dtype=float)
         return reactions
 
 
+def upper_banded(K, u=3):
+    """
+    Upper banded storage of a symmetric sparse matrix : ab[u + i - j, j] = K[i, j]
+    """
+    n = K.shape[0]
+    ab = np.zeros((u + 1, n))
+    for d in range(min(u, n - 1) + 1):
+        ab[u - d, d:] = K.diagonal(d)
+    return ab
+
+
 class DisplacementReactionCalculated:
     def __init__(self):
         """
         If we know R, we don't know d.
         If we know d, we don't know R.
-        [Ri] = [Ki][di]+[Qfi]
-        R = ['0', '0', 'F2y', '0', 'F3y', 'M3', ...] --example
-        d = ['d1', 'θ1', '0', 'θ2', '0', '0', ...] --example
-        calculate d1, θ1, θ2,... exclude known == 0, 0, ...
+        [R] = [K][d] + [Qf]
+        free DOFs : R known, solve [Kff][df] = [Rf] - [Qff]
+        fixed DOFs : d = 0, R from back substitution
         """
+        self.factor = None
 
-    def displacement(self, d0, K, Qf, R0):
+    def factorize(self, free, K):
         """
-        d0 : list of assembly displacement
-        K : np.array of global stiffness
+        free : boolean mask of unknown displacement
+        K : scipy.sparse global stiffness
+        Cholesky factor of the reduced stiffness [Kff], bandwidth 3
+        """
+        self.free = free
+        if not free.any():
+            self.factor = None
+            return
+
+        Kff = K[free][:, free]
+        try:
+            self.factor = linalg.cholesky_banded(upper_banded(Kff))
+        except linalg.LinAlgError as e:
+            print(f"Unstable structure, check support types : {e}")
+            raise
+
+    def displacement(self, free, K, Qf, R0):
+        """
+        free : boolean mask of unknown displacement
+        K : scipy.sparse global stiffness
         Qf : np.array of global FEF
-        R0 = list of nodal external force/reaction
+        R0 : np.array of nodal external force/reaction
         """
-        # If all fixed support
-        if all(value == 0 for value in d0):
-            di = np.array(d0)
-        else:
-            # index of unknowm displacement
-            J = np.where(np.array(d0) != "0")[0].tolist()
-            # index of reaction matched unknowm displacement
-            I = J
-            R1 = np.zeros((len(J), 1), dtype=float)  # --->Matrix [Ri]
-            # Assembly Ki matched index
-            K1 = np.zeros((len(I), len(J)))
-            for i in range(0, len(I)):
-                for j in range(0, len(J)):
-                    K1[i][j] = K[I[i]][J[j]]  # --->Matrix [Ki]
-
-            # Assembly Qfi index
-            Q01 = []
-            for item in I:
-                q01 = [Qf[item][0]]
-                Q01.append(q01)
-            Q01 = np.array(Q01)  # --->Matrix [Qfi]
-
-            # Assembly R index
-            for i in range(0, len(I)):
-                R1[i][0] = R0[I[i]]
-
-            # Calculate displacement
-            # [di] = inv[Ki][Ri]+(-1*[Qfi])
-            K1 = np.linalg.inv(K1)  # inverse[K1]
-
-            # unknown displacement
-            di = np.dot(K1, R1 + (-1 * Q01))  # dot matrix
+        self.factorize(free, K)
+
+        # [df] = inv[Kff]([Rf] - [Qff])
+        di = self.solve(R0[free] - Qf[free])
         return di  # Unit: displacement = m, θ = radian
 
-    # [R] = [K][d] + [Qf]
-    def reaction(self, d0, di, K, Qf):
+    def solve(self, rhs):
+        """
+        rhs : (free DOFs, m) right-hand side, one column per load case
+        Forward/back substitution with the stored factor of [Kff]
+        """
         # If all fixed support
-        if all(value == 0 for value in d0):
-            dy = np.array(d0).reshape(-1, 1)
-
-            # Calculated nodal reaction
-            R = Qf  # dot matrix
-        else:
-            # index of d where di will be added
-            ii = np.where(np.array(d0) != "0")[0].tolist()
+        if self.factor is None:
+            return np.zeros((0,) + rhs.shape[1:])
+        return linalg.cho_solve_banded((self.factor, False), rhs)
 
-            # added di to displacement d-matrix
-            for i in range(len(ii)):
-                d0[ii[i]] = di[i][0]
-
-            # Convert to array(ix1)
-            dy = np.array(d0).reshape(-1, 1)
-
-            # Calculated nodal reaction
-            R = np.dot(K, dy) + Qf  # dot matrix
-
-        print(f"\n[INFO] Nodal Displacement, [dy] : d1, θ1, d2, θ2, ...:")
-        print(f"{dy} m, radian,")
+    # [R] = [K][d] + [Qf]
+    def reaction(self, free, di, K, Qf):
+        dy = np.zeros(Qf.shape)
+        dy[free] = di
 
-        print(f"\n[INFO] Nodal Force, [R] : F1, M1, F2, M2, ... :")
-        print("[R] = [K][d] + [Qf]")
-        print(f"{R*1e-3} kN, kN-m")
+        # Calculated nodal reaction
+        R = K @ dy + Qf
 
         return dy, R
 
@@ -332,34 +710,93 @@ class ForcesCalculator:
         self.elements = elements
         self.loads = loads
         self.nodes = len(elements) + 1
+        self.stack = BeamElements.from_elements(elements)
+        self.tapered = (
+            []
+            if isinstance(elements, BeamElements)
+            else [i for i, e in enumerate(elements) if isinstance(e, TaperedBeamB)]
+        )
 
     def global_stiffness_matrix(self):
         K = np.zeros((2 * self.nodes, 2 * self.nodes))
         for i, element in enumerate(self.elements):
             K[2 * i : 2 * i + 4, 2 * i : 2 * i + 4] += element.k
-        print(f"\n[INFO] Global Stiffness Matrix : K")
-        print(f"{K}")
         return K
 
+    def element_scatter(self):
+        """
+        Global (row, col) index of every entry of each 4x4 element matrix
+        element i couples DOFs 2i, 2i+1, 2i+2, 2i+3
+        """
+        dofs = 2 * np.arange(len(self.elements))[:, None] + np.arange(4)  # (n, 4)
+        rows = np.repeat(dofs[:, :, None], 4, axis=2)  # (n, 4, 4)
+        cols = np.repeat(dofs[:, None, :], 4, axis=1)  # (n, 4, 4)
+        return rows, cols
+
+    def banded_stiffness_matrix(self):
+        """
+        Upper banded storage of K, shape (4, 2n) : ab[3 + i - j, j] = K[i, j]
+        Same layout as scipy.linalg.solveh_banded / cholesky_banded (lower=False)
+        """
+        ks = self.stack.k  # (n, 4, 4)
+        rows, cols = self.element_scatter()
+        upper = rows <= cols
+        ab = np.zeros((4, 2 * self.nodes))
+        np.add.at(ab, (3 + rows[upper] - cols[upper], cols[upper]), ks[upper])
+        return ab
+
+    def sparse_stiffness_matrix(self):
+        """
+        K as scipy.sparse CSR matrix, duplicate entries at shared nodes are summed
+        """
+        return self.sparse_global_matrix(self.stack.k)
+
+    def sparse_mass_matrix(self):
+        """
+        Consistent mass matrix M as scipy.sparse CSR matrix, same pattern as K
+        """
+        return self.sparse_global_matrix(self.stack.mass)
+
+    def sparse_global_matrix(self, ks):
+        # ks : (n, 4, 4) element matrices
+        rows, cols = self.element_scatter()
+        K = sparse.coo_matrix(
+            (ks.ravel(), (rows.ravel(), cols.ravel())),
+            shape=(2 * self.nodes, 2 * self.nodes),
+        )
+        return K.tocsr()
+
     def local_fixed_end_forces(self):
         """
         QF: Equivalent nodal reactions of each stretch
         """
-        forces = [np.zeros((4, 1)) for _ in range(len(self.spans))]
-        for i in range(len(self.spans)):
-            for load in self.loads[i]:
-                forces[i] += load.equivalent_nodal_reactions(self.elements[i].L)
-        print(f"\n[INFO] Local Fixed Force : \n{np.array(forces)*1e-3} kN, kN-m")
+        forces = list(self.span_fixed_end_forces(self.loads)[:, :, None])
         return forces
 
+    def span_fixed_end_forces(self, loads, spans=None):
+        """
+        Equivalent nodal reactions of each stretch for one set of span loads, (n, 4)
+        spans : only these stretch indices, rows in the same order
+        """
+        if isinstance(loads, LoadTable):
+            table = loads
+        else:
+            table = LoadTable.from_loads(loads, spans)
+
+        forces = table.fixed_end_forces(self.stack.L)
+
+        # Tapered stretches by quadrature instead of the prismatic closed forms
+        if self.tapered:
+            span_loads = loads.to_loads(len(self.stack)) if table is loads else loads
+            for i in self.tapered:
+                if spans is None or i in spans:
+                    forces[i] = self.elements[i].fixed_end_forces(span_loads[i])
+        return forces if spans is None else forces[spans]
+
     def global_fixed_end_forces(self, local_forces):
         global_forces = np.zeros((2 * self.nodes, 1))
-        for i in range(len(self.spans)):
-            global_forces[2 * i : 2 * i + 4] += local_forces[i]
-
-        print(
-            f"\n[INFO] Global Fixed Force : \n{np.array(global_forces)*1e-3} kN, kN-m"
-        )
+        dofs = 2 * np.arange(len(self.elements))[:, None] + np.arange(4)
+        np.add.at(global_forces, dofs, np.asarray(local_forces))
         return global_forces
 
     def internal_force(self, dy, QF):
@@ -368,29 +805,242 @@ class ForcesCalculator:
         QF : local fixed-end forces
         stretch : list of beam elements, each with a stiffness matrix 'k'
         """
-        # Validate inputs
-        u = []
-        F = []
+        # Local displacement of every stretch, (n, 4, m)
+        dofs = 2 * np.arange(len(self.elements))[:, None] + np.arange(4)
+        u = dy[dofs]
 
-        for i in range(len(self.elements)):
-            # Slice and reshape displacements
-            local_displacement = dy[2 * i : 2 * i + 4, :]
-            u.append(local_displacement)
+        # Fi = [ki][ui]+[QFi]
+        F = self.stack.k @ u + np.asarray(QF)
+        return list(u), list(F)
 
-            # Compute internal forces
-            # Fi = [ki][ui]+[QFi]
-            try:
-                internal_force = self.elements[i].k @ local_displacement + QF[i]
-                F.append(internal_force)
-            except ValueError as e:
-                print(f"Error in span {i+1}: {e}")
-                raise
 
-        print(
-            f"\n[INFO] Internal Force, Fi = [ki][ui]+[QFi] : \n{np.array(F)*1e-3} kN, kN-m"
+class BeamResult:
+    """
+    Results of one analysis, report text is only built on request
+    K : scipy.sparse global stiffness
+    QF : local fixed-end forces of each stretch, Qf : global fixed-end forces
+    dy : nodal displacement [d1, θ1, d2, θ2, ...], m, radian
+    R : nodal force [F1, M1, F2, M2, ...], N, N-m, R = [K][d] + [Qf]
+    F : member end forces [V1, M1, V2, M2] of each stretch, N, N-m
+
+    verbosity
+    0 : reactions
+    1 : + nodal displacement and nodal force
+    2 : + fixed-end forces and member end forces
+    3 : + element and global stiffness (dense, small beams only)
+    """
+
+    MAX_DENSE_DOFS = 40
+
+    def __init__(self, spans, supports, elements, K, QF, Qf, dy, R, F):
+        self.spans = spans
+        self.supports = supports
+        self.elements = elements
+        self.K = K
+        self.QF = QF
+        self.Qf = Qf
+        self.dy = dy
+        self.R = R
+        self.F = F
+
+    def reactions(self):
+        # Restrained DOFs only : [(node, "F" | "M", value N or N-m), ...]
+        free = DisplacementReactionAssembly.SUPPORT_FREE_DOFS[
+            np.asarray(self.supports, dtype=int)
+        ].ravel()
+        return [(i // 2 + 1, "FM"[i % 2], self.R[i, 0]) for i in np.flatnonzero(~free)]
+
+    def tables(self, verbosity=1):
+        """
+        [(title, headers, rows), ...] for the requested verbosity
+        """
+        tables = [
+            (
+                "Reactions",
+                ["Node", "", "kN, kN-m"],
+                [(node, dof, value * 1e-3) for node, dof, value in self.reactions()],
+            )
+        ]
+
+        if verbosity >= 1:
+            dy, R = self.dy[:, 0], self.R[:, 0] * 1e-3
+            tables.append(
+                (
+                    "Nodal Displacement [dy], Nodal Force [R] = [K][d] + [Qf]",
+                    ["Node", "d (mm)", "θ (rad)", "F (kN)", "M (kN-m)"],
+                    [
+                        (i + 1, dy[2 * i] * 1e3, dy[2 * i + 1], R[2 * i], R[2 * i + 1])
+                        for i in range(len(self.supports))
+                    ],
+                )
+            )
+
+        if verbosity >= 2:
+            headers = ["Span", "V1 (kN)", "M1 (kN-m)", "V2 (kN)", "M2 (kN-m)"]
+            tables.append(
+                (
+                    "Local Fixed Force [QF]",
+                    headers,
+                    [(i + 1, *(q[:, 0] * 1e-3)) for i, q in enumerate(self.QF)],
+                )
+            )
+            tables.append(
+                (
+                    "Internal Force, Fi = [ki][ui]+[QFi]",
+                    headers,
+                    [(i + 1, *(f[:, 0] * 1e-3)) for i, f in enumerate(self.F)],
+                )
+            )
+
+        return tables
+
+    def matrices(self):
+        # Element and global stiffness as text, skipped for large beams
+        if self.K.shape[0] > self.MAX_DENSE_DOFS:
+            return [f"K : {self.K.shape[0]} DOFs, {self.K.nnz} non-zeros (not shown)"]
+        text = [f"K{i+1}\n{element.k}" for i, element in enumerate(self.elements)]
+        text.append(f"Global Stiffness Matrix : K\n{self.K.toarray()}")
+        return text
+
+    def report(self, verbosity=1):
+        text = []
+        for title, headers, rows in self.tables(verbosity):
+            text.append(f"\n[INFO] {title}")
+            text.append(
+                tabulate(rows, headers=headers, floatfmt=".4g", tablefmt="psql")
+            )
+        if verbosity >= 3:
+            text += [f"\n[INFO] {matrix}" for matrix in self.matrices()]
+        return "\n".join(text)
+
+    def to_html(self, verbosity=1):
+        html = []
+        for title, headers, rows in self.tables(verbosity):
+            html.append(f"<h4>{title}</h4>")
+            html.append(
+                tabulate(rows, headers=headers, floatfmt=".4g", tablefmt="html")
+            )
+        if verbosity >= 3:
+            html += [f"<pre>{matrix}</pre>" for matrix in self.matrices()]
+        return "\n".join(html)
+
+    def __str__(self):
+        return self.report()
+
+    def _repr_html_(self):
+        return self.to_html()
+
+
+class LoadCase:
+    """Named load set : span loads (per stretch) and nodal external forces R0"""
+
+    def __init__(self, name, loads, R0=None):
+        self.name = name
+        self.loads = loads
+        self.R0 = R0
+
+    def __str__(self):
+        return f"Load Case {self.name}"
+
+
+class LoadCaseResult:
+    """
+    Responses of many load cases, one column per case
+    dy : (2N, m) nodal displacement
+    R : (2N, m) nodal force/reaction
+    F : (n, 4, m) member end forces [V1, M1, V2, M2] of each stretch
+    loads : span loads of each case, for diagrams
+    """
+
+    def __init__(self, names, loads, dy, R, F):
+        self.names = list(names)
+        self.loads = loads
+        self.dy = dy
+        self.R = R
+        self.F = F
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def case(self, name):
+        # dy, R, F of one case in the shape of the single-case analysis
+        j = self.index(name)
+        return (
+            self.dy[:, j : j + 1],
+            self.R[:, j : j + 1],
+            list(self.F[:, :, j : j + 1]),
+        )
+
+    def combine(self, combinations):
+        """
+        combinations : {"1.4DL+1.7LL": {"DL": 1.4, "LL": 1.7}, ...}
+        Linear superposition of the case columns, returns LoadCaseResult
+        """
+        C = np.zeros((len(self.names), len(combinations)))
+        for j, factors in enumerate(combinations.values()):
+            for name, factor in factors.items():
+                C[self.index(name), j] = factor
+
+        loads = []
+        for factors in combinations.values():
+            span_loads = [[] for _ in range(self.F.shape[0])]
+            for name, factor in factors.items():
+                for i, case_loads in enumerate(self.loads[self.index(name)]):
+                    span_loads[i] += [load.scaled(factor) for load in case_loads]
+            loads.append(span_loads)
+
+        return LoadCaseResult(
+            combinations.keys(), loads, self.dy @ C, self.R @ C, self.F @ C
         )
 
-        return u, F
+
+class LoadCaseAnalysis:
+    """
+    Factor [Kff] once, then solve every load case as one right-hand-side matrix
+    """
+
+    def __init__(self, spans, supports, elements):
+        self.spans = spans
+        self.elements = elements
+        self.forces = ForcesCalculator(spans, elements, None)
+        self.K = self.forces.sparse_stiffness_matrix()
+
+        dr_assembly = DisplacementReactionAssembly(spans, supports, elements, None)
+        self.free, self.fixed = dr_assembly.dof_masks()
+        self.dr_assembly = dr_assembly
+
+        self.dr_calculator = DisplacementReactionCalculated()
+        self.dr_calculator.factorize(self.free, self.K)
+
+    def solve(self, cases):
+        """
+        cases : list of LoadCase
+        """
+        n = len(self.elements)
+        dofs = 2 * np.arange(n)[:, None] + np.arange(4)  # (n, 4)
+
+        # Local and global fixed-end forces, (n, 4, m) and (2N, m)
+        QF = np.stack(
+            [self.forces.span_fixed_end_forces(case.loads) for case in cases], axis=-1
+        )
+        Qf = np.zeros((2 * (n + 1), len(cases)))
+        np.add.at(Qf, dofs, QF)
+
+        R0 = np.hstack(
+            [self.dr_assembly.assemble_nodal_reactions(case.R0) for case in cases]
+        )
+
+        # [df] = inv[Kff]([Rf] - [Qff]), [R] = [K][d] + [Qf]
+        dy = np.zeros(Qf.shape)
+        dy[self.free] = self.dr_calculator.solve(R0[self.free] - Qf[self.free])
+        R = self.K @ dy + Qf
+
+        # Fi = [ki][ui]+[QFi]
+        F = self.forces.stack.k @ dy[dofs] + QF
+
+        return LoadCaseResult(
+            [case.name for case in cases], [case.loads for case in cases], dy, R, F
+        )
 
 
 class UserInput:
@@ -471,6 +1121,7 @@ class UserInput:
         q = DistributedLoad (value, start, length), distance between the left end of the span and the start of the load
         P = PointLoad(value, position), Load position with respect to the left end of the section
         M = MomentConcentrated (value, position),  position of the moment with respect to the left end of the section'
+        T = LinearlyVaryingLoad (start value, end value, start, length), trapezoidal/triangular line load
         """
         print(f"\nDefine loads in each stretch : unit in --> kN, kN-m")
         print(f"You have {len(self.spans)} stretch")
@@ -481,9 +1132,9 @@ class UserInput:
             while True:
                 try:
                     type = input(
-                        "Choose load type(P, q , M) or other keyboard type if none : "
+                        "Choose load type(P, q , M, T) or other keyboard type if none : "
                     ).lower()
-                    if type in ("p", "q", "m"):
+                    if type in ("p", "q", "m", "t"):
                         if type == "p":
                             value = (
                                 get_valid_number(
@@ -512,6 +1163,28 @@ class UserInput:
                             )
                             f = DistributedLoad(value, start, length)
                             loads[i].append(f)
+
+                        elif type == "t":
+                            q1 = (
+                                get_valid_number(
+                                    "Define line load at the start q1(kN/m) , Down+ Up- : "
+                                )
+                                * 1e3
+                            )  # convert kN to N
+                            q2 = (
+                                get_valid_number(
+                                    "Define line load at the end q2(kN/m) , Down+ Up- : "
+                                )
+                                * 1e3
+                            )  # convert kN to N
+                            start = get_valid_number(
+                                "Define start point x(m) distance between the left end of the span and the start of the load : "
+                            )
+                            length = get_valid_number(
+                                "Define length of line load l(m) : "
+                            )
+                            f = LinearlyVaryingLoad(q1, q2, start, length)
+                            loads[i].append(f)
                         else:
                             value = get_valid_number("Define moment m(N-m) :") * 1e3
                             x = get_valid_number(
@@ -531,31 +1204,108 @@ class UserInput:
         return loads
 
 
+class PiecewiseCurve:
+    """
+    Exact piecewise polynomial of one span, breakpoints at load boundaries
+    ppoly : scipy.interpolate.PPoly, local x from the left node of the span
+    """
+
+    def __init__(self, ppoly):
+        self.ppoly = ppoly
+
+    @classmethod
+    def from_function(cls, f, breakpoints, degree=3):
+        """
+        f : vectorized function of x, a polynomial of at most `degree` on each
+        interval between breakpoints. It is sampled at degree + 1 interior
+        Chebyshev points of every interval, so the fit is exact.
+        """
+        x = np.unique(breakpoints)
+        x = x[np.concatenate([[True], np.diff(x) > 1e-9 * x[-1]])]
+        h = np.diff(x)
+
+        # Interior nodes t in (0, 1), shared Vandermonde for every interval
+        k = np.arange(degree + 1)
+        t = 0.5 - 0.5 * np.cos((2 * k + 1) * np.pi / (2 * degree + 2))
+        V = np.vander(t, increasing=True)
+
+        values = f(x[:-1, None] + h[:, None] * t)  # (intervals, degree + 1)
+        d = np.linalg.solve(V, values.T)  # coefficients of t**j
+        c = d / h ** k[:, None]  # coefficients of (x - x_i)**j
+        return cls(interpolate.PPoly(c[::-1], x))
+
+    def __call__(self, x):
+        return self.ppoly(x)
+
+    def extrema(self):
+        """
+        Max/min over the span from both limits at every breakpoint and the roots
+        of the derivative inside each interval
+        Returns maxV, x of maxV, minV, x of minV
+        """
+        c, x = self.ppoly.c, self.ppoly.x
+        h = np.diff(x)
+        powers = np.arange(c.shape[0])[::-1, None]
+
+        left = c[-1]  # value just right of x_i
+        right = (c * h**powers).sum(axis=0)  # value just left of x_i+1
+        roots = self.ppoly.derivative().roots(discontinuity=False, extrapolate=False)
+        roots = roots[np.isfinite(roots)]
+
+        values = np.concatenate([left, right, self.ppoly(roots)])
+        where = np.concatenate([x[:-1], x[1:], roots])
+
+        imax, imin = np.argmax(values), np.argmin(values)
+        return values[imax], where[imax], values[imin], where[imin]
+
+
+def load_breakpoints(loads, L):
+    # Span ends, load positions and ends of distributed loads
+    x = [0.0, L]
+    for load in loads:
+        x += [load.a, load.a + getattr(load, "l", 0.0)]
+    return np.clip(x, 0, L)
+
+
 class CurveValueCalculator:
     def __init__(self):
         pass
 
-        # Calculate shear force values
+    def shear_curve(self, loads, L, F):
+        """
+        V(x) of one stretch : shear at the extreme left + internal shear of loads
+        """
 
-    def shears(self, spans, stretch, loads, F):
-        numS, Xt = xi_coordinate(spans)
-        Shears = []
-        for i in range(len(spans)):  # for each stretch
+        def V(x):
             # Shear like unsupported beams(Internal Shear)
-            Q0 = np.zeros(numS)
-            for j in range(len(loads[i])):  # consider all the loads of each stretch
-                m = 0  # para enumerar las secciones
-                for x in Xt[i]:  # to list the sections
-                    Q0[m] += loads[i][j].shear_force(
-                        x, stretch[i].L
-                    )  # Calculate Qi given xi
-                    m += 1
+            Q0 = np.zeros(np.shape(x))
+            for load in loads:  # consider all the loads of each stretch
+                Q0 += load.shear_force(x, L)
+            return Q0 + F[0]
+
+        return PiecewiseCurve.from_function(V, load_breakpoints(loads, L))
+
+    def moment_curve(self, loads, L, F):
+        """
+        M(x) of one stretch : simply supported moments + embedment/continuity
+        """
+
+        def M(x):
+            # Moments like stretchs simply supported
+            M0 = np.zeros(np.shape(x))
+            for load in loads:  # consider all the loads of each stretch
+                M0 += load.bending_moment(x, L)
+            # Moments due to embedment or continuity of the beam
+            return M0 - F[1] + (F[3] + F[1]) / L * x
 
-            # Shear at the extreme left, obtained from the calculation
-            Q1 = F[i][0]
+        return PiecewiseCurve.from_function(M, load_breakpoints(loads, L))
 
-            # Total shear
-            Shears.append(Q0 + Q1)
+    # Calculate shear force values
+    def shears(self, spans, stretch, loads, F):
+        self.shear_curves = [
+            self.shear_curve(loads[i], stretch[i].L, F[i][:, 0])
+            for i in range(len(spans))
+        ]
 
         # Maximum and minimum shear force values (in each stretch)
         maxShear = []  # Maximum shear for each stretch
@@ -564,49 +1314,30 @@ class CurveValueCalculator:
         XminQ = []  # locations of the minimum in each stretch
 
         print(f"\nSHEAR")
-        for i in range(len(spans)):
-            maxQ = max(Shears[i])  # Máximo Shearnte
-            minQ = min(Shears[i])  # Mínimo Shearnte
+        for i, curve in enumerate(self.shear_curves):
+            maxQ, xmaxQ, minQ, xminQ = curve.extrema()
             print(f"Span {i+1} : maxQ = {maxQ/1000:.2f}, minQ = {minQ/1000:.2f} ,kN")
+            print(f"At location x = {xmaxQ:.2f}, {xminQ:.2f} ,m")
 
             maxShear.append(maxQ)
             minShear.append(minQ)
-            indMaxQ = np.where(Shears[i] == maxQ)[0][0]  # index of maximum shear
-            indMinQ = np.where(Shears[i] == minQ)[0][0]  # index of minimum shear
-            XmaxQ.append(Xt[i][indMaxQ])  # location of maximum shear
-            XminQ.append(Xt[i][indMinQ])  # location of minimum shear
-            print(f"At location x = {Xt[i][indMaxQ]:.2f}, {Xt[i][indMinQ]:.2f} ,m")
+            XmaxQ.append(xmaxQ)  # location of maximum shear
+            XminQ.append(xminQ)  # location of minimum shear
 
-        # Shear Force Values for Charts
+        # Shear Force Values for Charts, sampled only here
+        numS, Xt = xi_coordinate(spans)
         DFQ = []
-        for i in range(len(spans)):
-            # Values for list type DFQ
-            # Shear = (Shears[i]).tolist() # We go to kN and we convert to list, N
-            Shear = (
-                Shears[i] / 1000
-            ).tolist()  # We go to kN and we convert to list, kN
-            DFQ += Shear
+        for i, curve in enumerate(self.shear_curves):
+            DFQ += (curve(Xt[i]) / 1000).tolist()  # kN
 
         return DFQ, maxShear, minShear, XmaxQ, XminQ
 
     # Calculate bending moment values
     def moments(self, spans, stretch, loads, F):
-        numS, Xt = xi_coordinate(spans)
-        Moments = []
-        for i in range(len(spans)):  # for each stretch
-            # Moments like stretchs simply supported
-            M0 = np.zeros(numS)
-            for j in range(len(loads[i])):  # consider all the loads of each stretch
-                m = 0  # to list the sections
-                for x in Xt[i]:  # go through the sections
-                    M0[m] += loads[i][j].bending_moment(x, stretch[i].L)
-                    m += 1
-
-            # Moments due to embedment or continuity of the beam
-            M1 = -F[i][1] + (F[i][3] + F[i][1]) / stretch[i].L * Xt[i]
-
-            # Total moment
-            Moments.append(M0 + M1)
+        self.moment_curves = [
+            self.moment_curve(loads[i], stretch[i].L, F[i][:, 0])
+            for i in range(len(spans))
+        ]
 
         # Maximum and minimum bending moment values (in each stretch)
         maxMoment = []  # Maximum moment in each stretch
@@ -614,58 +1345,427 @@ class CurveValueCalculator:
         XmaxF = []  # locations of maximum moments by stretch
         XminF = []  # locations of the minimum moments by stretch
         print(f"\nMOMENT")
-        for i in range(len(spans)):
-            maxF = max(Moments[i])  # Máximo flector
-            minF = min(Moments[i])  # Mínimo flector
+        for i, curve in enumerate(self.moment_curves):
+            maxF, xmaxF, minF, xminF = curve.extrema()
             print(f"Span {i+1} : maxF = {maxF/1000:.2f}, minF = {minF/1000:.2f} ,kN-m")
+            print(f"At location x = {xmaxF:.2f}, {xminF:.2f} ,m")
 
             maxMoment.append(-maxF)
             minMoment.append(-minF)
-            indMaxF = np.where(Moments[i] == maxF)[0][0]  # index of maximum bending
-            indMinF = np.where(Moments[i] == minF)[0][0]  # index of minimum bending
-            XmaxF.append(Xt[i][indMaxF])  # location of maximum bending
-            XminF.append(Xt[i][indMinF])  # location of minimum bending
-            print(f"At location x = {Xt[i][indMaxF]:.2f}, {Xt[i][indMinF]:.2f} ,m")
+            XmaxF.append(xmaxF)  # location of maximum bending
+            XminF.append(xminF)  # location of minimum bending
 
-        # Bending moment values for graphs
+        # Bending moment values for graphs, sampled only here
+        numS, Xt = xi_coordinate(spans)
         DMF = []
-        for i in range(len(spans)):
-            Flex = (-1 * Moments[i] / 1000).tolist()  # ***
-            DMF += Flex
+        for i, curve in enumerate(self.moment_curves):
+            DMF += (-1 * curve(Xt[i]) / 1000).tolist()  # ***
 
         return DMF, maxMoment, minMoment, XmaxF, XminF
 
+    def deflection_curve(self, loads, element, u, QF):
+        """
+        w(x) of one stretch, up +
+        u : nodal [d1, θ1, d2, θ2] of the stretch
+        QF : fixed-end forces of the stretch loads
+        Hermite shape functions of u + particular solution of the loads with
+        both ends fixed, w_p'' = M_fixed(x) / EI, w_p = w_p' = 0 at both ends
+        """
+        L, EI = element.L, element.E * element.I
+        d1, θ1, d2, θ2 = u
 
-class BeamAnalysis:
-    def __init__(self, E, I):
-        userInput = UserInput()
-        report = Report()
+        # Hermite cubic : N1 d1 + N2 θ1 + N3 d2 + N4 θ2
+        c = np.array(
+            [
+                d1,
+                θ1,
+                (-3 * d1 - 2 * L * θ1 + 3 * d2 - L * θ2) / L**2,
+                (2 * d1 + L * θ1 - 2 * d2 + L * θ2) / L**3,
+            ]
+        )
+        wp = self.moment_curve(loads, L, QF).ppoly.antiderivative(2)
+
+        def w(x):
+            return np.polynomial.polynomial.polyval(x, c) + wp(x) / EI
+
+        return PiecewiseCurve.from_function(w, wp.x, degree=max(3, wp.c.shape[0] - 1))
 
+    def rotation_curve(self, loads, element, u, QF):
+        curve = self.deflection_curve(loads, element, u, QF)
+        return PiecewiseCurve(curve.ppoly.derivative())
+
+    def deflections(self, spans, stretch, loads, dy, QF):
+        """
+        dy : global nodal displacement, QF : local fixed-end forces of each stretch
+        Returns DDF (mm, Down+ for plotting), max deflection of each stretch (m, up +)
+        and its location
+        """
+        self.deflection_curves = [
+            self.deflection_curve(
+                loads[i], stretch[i], dy[2 * i : 2 * i + 4, 0], QF[i][:, 0]
+            )
+            for i in range(len(spans))
+        ]
+
+        maxDelta = []  # Largest deflection of each stretch
+        XmaxDelta = []  # location of largest deflection
+        print(f"\nDEFLECTION")
+        for i, curve in enumerate(self.deflection_curves):
+            maxW, xmaxW, minW, xminW = curve.extrema()
+            delta, x = (maxW, xmaxW) if abs(maxW) > abs(minW) else (minW, xminW)
+            print(f"Span {i+1} : delta = {delta*1000:.2f} mm, at x = {x:.2f} m")
+
+            maxDelta.append(delta)
+            XmaxDelta.append(x)
+
+        # Deflection values for graphs
+        numS, Xt = xi_coordinate(spans)
+        DDF = []
+        for i, curve in enumerate(self.deflection_curves):
+            DDF += (-1 * curve(Xt[i]) * 1000).tolist()  # mm
+
+        return DDF, maxDelta, XmaxDelta
+
+    def diagram_chunks(self, stretch, loads, F, dy, QF, numS=1000):
+        """
+        Diagram values one span at a time, curves are built and dropped per span
+        Yields {"span", "x" (m from the left end of the beam), "V" (kN),
+        "M" (kN-m), "delta" (mm, Down+)} of numS points
+        """
+        x0 = 0.0
+        for i in range(len(stretch)):
+            element = stretch[i]
+            x = np.linspace(0, element.L, numS)
+            V = self.shear_curve(loads[i], element.L, F[i][:, 0])
+            M = self.moment_curve(loads[i], element.L, F[i][:, 0])
+            w = self.deflection_curve(
+                loads[i], element, dy[2 * i : 2 * i + 4, 0], QF[i][:, 0]
+            )
+            yield {
+                "span": np.full(numS, i + 1),
+                "x": x0 + x,
+                "V": V(x) / 1000,
+                "M": M(x) / 1000,
+                "delta": -w(x) * 1000,
+            }
+            x0 += element.L
+
+
+class BeamModel:
+    """Beam definition for analysis without prompts
+    Attributes:
+        E: Modulus of elasticity, GPa
+        I: Moment of inertia, m4
+        spans: Span lengths, m
+        supports: Support type of each node [fixd=0, vert-scroll=1, pin=2, free=3]
+        R0: Nodal external force [F1y, M1, F2y, M2, ...], N, N-m
+        loads: Loads in each stretch, list of PointLoad/DistributedLoad/ConcentratedMoment
+    """
+
+    def __init__(self, E, I, spans, supports, loads=None, R0=None, name=""):
+        self.name = name
+        self.E = E
+        self.I = I
+        self.spans = list(spans)
+        self.supports = list(supports)
+        self.loads = loads if loads is not None else [[] for _ in self.spans]
+        self.R0 = R0 if R0 is not None else [0.0] * (2 * len(self.supports))
+
+        if len(self.supports) != len(self.spans) + 1:
+            raise ValueError(
+                f"{len(self.spans)} spans need {len(self.spans) + 1} supports."
+            )
+        if len(self.loads) != len(self.spans):
+            raise ValueError(
+                f"Loads must be given for each of {len(self.spans)} spans."
+            )
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Same units as the prompts : kN, kN/m, kN-m, m
+        {
+            "name": "B1", "E": 200, "I": 1.38e-4,
+            "spans": [4, 4], "supports": [2, 2, 2],
+            "R0": [0, 0, -10, 0, 0, 0],
+            "loads": [[{"type": "q", "value": 10, "a": 0, "l": 4}],
+                      [{"type": "P", "value": 20, "a": 2}, {"type": "M", "value": 5, "a": 1},
+                     {"type": "T", "value": [0, 10], "a": 0, "l": 4}]]
+        }
+        T = linearly varying load, value = [q1, q2]
+        """
+        loads = []
+        for span_loads in data.get("loads", [[] for _ in data["spans"]]):
+            stretch = []
+            for load in span_loads:
+                type = load["type"].lower()
+                value = np.multiply(load["value"], 1e3)  # convert kN to N
+                if type == "p":
+                    stretch.append(PointLoad(value, load["a"]))
+                elif type == "q":
+                    stretch.append(DistributedLoad(value, load["a"], load["l"]))
+                elif type == "m":
+                    stretch.append(ConcentratedMoment(value, load["a"]))
+                elif type == "t":
+                    q1, q2 = value
+                    stretch.append(LinearlyVaryingLoad(q1, q2, load["a"], load["l"]))
+                else:
+                    raise ValueError(
+                        f"Unknown load type {load['type']!r}, use P, q, M, T"
+                    )
+            loads.append(stretch)
+
+        R0 = data.get("R0")
+        return cls(
+            data["E"],
+            data["I"],
+            data["spans"],
+            data["supports"],
+            loads,
+            [f * 1e3 for f in R0] if R0 else None,  # convert kN to N
+            data.get("name", ""),
+        )
+
+    def analyse(self):
+        """
+        Quiet single-case solve, returns LoadCaseResult
+        """
+        elements = BeamElements(self.E * 1e9, self.I, self.spans)  # GPa to Pa
+        analysis = LoadCaseAnalysis(self.spans, self.supports, elements)
+        return analysis.solve([LoadCase(self.name, self.loads, self.R0)])
+
+
+def load_models(path):
+    """
+    Read beam models from .json (list or one model), .jsonl (one per line) or .yaml
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8") as f:
+        if ext == ".jsonl":
+            data = [json.loads(line) for line in f if line.strip()]
+        elif ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML input needs PyYAML : pip install pyyaml")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if isinstance(data, dict):
+        data = data.get("beams", [data])
+    return [BeamModel.from_dict(item) for item in data]
+
+
+class BeamSession:
+    """
+    Keeps the factorization of [Kff] for what-if changes of one BeamModel
+    set_inertia : element stiffness change, applied as a rank <= 4 update
+        (Sherman-Morrison-Woodbury) on top of the stored factor
+    set_loads / add_load : only the fixed-end forces change, a solve is a
+        forward/back substitution
+    The factor is rebuilt when the accumulated update rank exceeds MAX_UPDATE_RANK
+    """
+
+    MAX_UPDATE_RANK = 64
+
+    def __init__(self, model):
+        self.model = model
+        self.spans = list(model.spans)
+        self.supports = list(model.supports)
+        self.loads = [list(span_loads) for span_loads in model.loads]
+        self.R0 = model.R0
+        self.elements = BeamElements(model.E * 1e9, model.I, self.spans)
+
+        self.forces = ForcesCalculator(self.spans, self.elements, self.loads)
+        self.dr_assembly = DisplacementReactionAssembly(
+            self.spans, self.supports, self.elements, self.loads
+        )
+        self.free, self.fixed = self.dr_assembly.dof_masks()
+        self.reduced = np.cumsum(self.free) - 1  # global DOF -> index in [Kff]
+        self.dr_calculator = DisplacementReactionCalculated()
+
+        self.QF = self.forces.span_fixed_end_forces(self.loads)
+        self.refactor()
+
+    def refactor(self):
+        self.K = self.forces.sparse_stiffness_matrix()
+        self.dr_calculator.factorize(self.free, self.K)
+        self.U = []  # reduced DOF index of each update column
+        self.C = np.zeros((0, 0))  # block diagonal of the updates
+        self.Z = np.zeros((self.free.sum(), 0))  # inv[Kff] U
+
+    def set_inertia(self, span, I):
+        old = self.elements[span]
+        new = BeamB(old.E, I, old.L, m=old.m)
+        self.elements[span] = new
+
+        dofs = 2 * span + np.arange(4)
+        dk = new.k - old.k
+        self.K = self.K + sparse.coo_matrix(
+            (dk.ravel(), (np.repeat(dofs, 4), np.tile(dofs, 4))), shape=self.K.shape
+        )
+
+        local = self.free[dofs]
+        if not local.any():
+            return
+        if len(self.U) + local.sum() > self.MAX_UPDATE_RANK:
+            self.refactor()
+            return
+
+        # [Kff] + U C U^T, U selects the free DOFs of the element
+        idx = self.reduced[dofs[local]]
+        E = np.zeros((self.Z.shape[0], len(idx)))
+        E[idx, np.arange(len(idx))] = 1
+        self.U += idx.tolist()
+        self.C = linalg.block_diag(self.C, dk[np.ix_(local, local)])
+        self.Z = np.hstack([self.Z, self.dr_calculator.solve(E)])
+
+    def set_loads(self, span, loads):
+        self.loads[span] = list(loads)
+        self.QF[span] = self.forces.span_fixed_end_forces(self.loads, [span])[0]
+
+    def add_load(self, span, load):
+        self.set_loads(span, self.loads[span] + [load])
+
+    def solve_reduced(self, rhs):
+        """
+        inv[Kff + U C U^T] rhs
+        = y - Z inv[I + C U^T Z] C U^T y, y = inv[Kff] rhs
+        """
+        y = self.dr_calculator.solve(rhs)
+        if not self.U:
+            return y
+        S = np.eye(len(self.U)) + self.C @ self.Z[self.U]
+        return y - self.Z @ np.linalg.solve(S, self.C @ y[self.U])
+
+    def solve(self):
+        n = len(self.elements)
+        dofs = 2 * np.arange(n)[:, None] + np.arange(4)
+
+        Qf = np.zeros((2 * (n + 1), 1))
+        np.add.at(Qf, dofs, self.QF[:, :, None])
+        R0 = self.dr_assembly.assemble_nodal_reactions(self.R0)
+
+        dy = np.zeros(Qf.shape)
+        dy[self.free] = self.solve_reduced(R0[self.free] - Qf[self.free])
+        R = self.K @ dy + Qf
+
+        F = self.forces.stack.k @ dy[dofs] + self.QF[:, :, None]
+
+        return BeamResult(
+            self.spans,
+            self.supports,
+            self.elements,
+            self.K,
+            list(self.QF[:, :, None]),
+            Qf,
+            dy,
+            R,
+            list(F),
+        )
+
+
+class SectionSweep:
+    """
+    Prismatic beam with uniform EI : moments, shears and reactions do not depend
+    on EI and deflections scale with 1/EI. One solve with the model's I, then every
+    row of a section table is checked by scaling.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.I = model.I
+        self.elements = BeamElements(model.E * 1e9, model.I, model.spans)
+
+        analysis = LoadCaseAnalysis(model.spans, model.supports, self.elements)
+        result = analysis.solve([LoadCase(model.name, model.loads, model.R0)])
+        dy, self.R, F = result.case(model.name)
+
+        # Extrema of each span, N, N-m, m
+        coords = CurveValueCalculator()
+        QF = ForcesCalculator(model.spans, self.elements, None)
+        QF = QF.span_fixed_end_forces(model.loads)
+        self.Mu = np.zeros(len(model.spans))
+        self.Vu = np.zeros(len(model.spans))
+        self.delta = np.zeros(len(model.spans))
+        for i, element in enumerate(self.elements):
+            loads, L = model.loads[i], element.L
+            Mmax, _, Mmin, _ = coords.moment_curve(loads, L, F[i][:, 0]).extrema()
+            Vmax, _, Vmin, _ = coords.shear_curve(loads, L, F[i][:, 0]).extrema()
+            u = dy[2 * i : 2 * i + 4, 0]
+            w = coords.deflection_curve(loads, element, u, QF[i])
+            wmax, _, wmin, _ = w.extrema()
+
+            self.Mu[i] = max(abs(Mmax), abs(Mmin))
+            self.Vu[i] = max(abs(Vmax), abs(Vmin))
+            self.delta[i] = max(abs(wmax), abs(wmin))
+
+    def check(self, df, Fy=250, limit=360, ø=0.9):
+        """
+        df : section table with Ix (cm4) and Zx (cm3), e.g. H-Sections.csv
+        Fy : yield strength, MPa
+        limit : allowable deflection L/limit
+        Returns a copy of df with Mu, øMn (kN-m), flexure and deflection ratios
+        """
+        Ix = df["Ix"].to_numpy(dtype=float) * 1e-8  # m4
+        Zx = df["Zx"].to_numpy(dtype=float) * 1e-6  # m3
+        spans = np.asarray(self.model.spans, dtype=float)
+
+        øMn = ø * Fy * 1e6 * Zx  # N-m
+        delta = np.outer(self.I / Ix, self.delta)  # (sections, spans), m
+
+        df = df.copy()
+        df["Mu"] = self.Mu.max() * 1e-3  # kN-m
+        df["øMn"] = øMn * 1e-3  # kN-m
+        df["flexure"] = self.Mu.max() / øMn
+        df["delta"] = delta.max(axis=1) * 1e3  # mm
+        df["deflection"] = (delta / (spans / limit)).max(axis=1)
+        df["OK"] = (df["flexure"] <= 1) & (df["deflection"] <= 1)
+        return df
+
+
+class BeamAnalysis:
+    def __init__(self, E, I, model=None):
+        """
+        model : BeamModel, if None spans, supports and loads are asked by prompts
+        """
         self.E = E  # GPa
         self.I = I  # m4
-        self.spans = userInput.spans_length()
-        self.supports = userInput.supports_type()
-        self.R0 = userInput.external_loads()
-        self.loads = userInput.loads_type()
 
-        report.report(self.spans, self.supports, self.R0, self.loads)
+        if model is None:
+            userInput = UserInput()
+            report = Report()
+
+            self.spans = userInput.spans_length()
+            self.supports = userInput.supports_type()
+            self.R0 = userInput.external_loads()
+            self.loads = userInput.loads_type()
+
+            report.report(self.E, self.spans, self.supports, self.R0, self.loads)
+        else:
+            self.spans = model.spans
+            self.supports = model.supports
+            self.R0 = model.R0
+            self.loads = model.loads
 
         self.coords = CurveValueCalculator()
 
-    def calculators_force(self):
+    @classmethod
+    def from_model(cls, model):
+        return cls(model.E, model.I, model)
+
+    def calculators_force(self, verbosity=None):
+        """
+        verbosity : print BeamResult.report at this level, None = quiet
+        """
         # Bernoulli Beam
-        print(f"\n[INFO] Bernoulli Beam : ")
-        self.stretch = []
-        for i in range(len(self.spans)):
-            st = BeamB(self.E, self.I, self.spans[i])
-            print(f"K{i+1}")
-            print(f"{st.k}")
-            self.stretch.append(st)
+        self.stretch = BeamElements(self.E * 1e9, self.I, self.spans)  # GPa to Pa
 
         # Calculate stiffness K, Fixend forces
         forces = ForcesCalculator(self.spans, self.stretch, self.loads)
 
-        K = forces.global_stiffness_matrix()
+        K = forces.sparse_stiffness_matrix()
         QF = forces.local_fixed_end_forces()
         Qf = forces.global_fixed_end_forces(QF)
 
@@ -673,14 +1773,45 @@ class BeamAnalysis:
         dr_assembly = DisplacementReactionAssembly(
             self.spans, self.supports, self.stretch, self.loads
         )
-        d0 = dr_assembly.assemble_nodal_displacement()
+        free, fixed = dr_assembly.dof_masks()
         R = dr_assembly.assemble_nodal_reactions(self.R0)
 
         dr_calculator = DisplacementReactionCalculated()
-        di = dr_calculator.displacement(d0, K, Qf, R)
-        dy, Ri = dr_calculator.reaction(d0, di, K, Qf)
+        di = dr_calculator.displacement(free, K, Qf, R)
+        dy, Ri = dr_calculator.reaction(free, di, K, Qf)
 
         u, self.F = forces.internal_force(dy, QF)
+        self.dy, self.QF = dy, QF
+
+        self.result = BeamResult(
+            self.spans, self.supports, self.stretch, K, QF, Qf, dy, Ri, self.F
+        )
+        if verbosity is not None:
+            print(self.result.report(verbosity))
+        return self.result
+
+    def calculators_load_cases(self, cases, combinations=None):
+        """
+        cases : list of LoadCase, e.g. DL, LL, WL
+        combinations : {"name": {"case name": factor, ...}, ...}
+        """
+        self.stretch = BeamElements(self.E * 1e9, self.I, self.spans)  # GPa to Pa
+
+        analysis = LoadCaseAnalysis(self.spans, self.supports, self.stretch)
+        self.cases = analysis.solve(cases)
+        if combinations:
+            self.combinations = self.cases.combine(combinations)
+        return self.cases
+
+    def export(self, path, numS=1000):
+        """
+        Write the diagrams of the last calculators_force span by span to .csv,
+        .npz or .parquet, returns the number of rows
+        """
+        chunks = self.coords.diagram_chunks(
+            self.stretch, self.loads, self.F, self.dy, self.QF, numS
+        )
+        return write_chunks(chunks, path)
 
     def plot_diagram(self):
         plot = Plot()
@@ -695,6 +1826,11 @@ class BeamAnalysis:
             self.spans, self.stretch, self.loads, self.F
         )
 
+        # Calculate deflection coordinate for plotting
+        deflectionDDF, maxDelta, XmaxDelta = self.coords.deflections(
+            self.spans, self.stretch, self.loads, self.dy, self.QF
+        )
+
         # Total length of the beam
         Ltotal = 0
         for i in range(len(self.stretch)):
@@ -715,6 +1851,7 @@ class BeamAnalysis:
             minMoment,
             XmaxF,
             XminF,
+            deflectionDDF,
         )
 
         fig.show()
@@ -727,7 +1864,7 @@ class Report:
     ) -> None:
         pass
 
-    def report(self, spans, supports, R0, loads):
+    def report(self, E, spans, supports, R0, loads):
         print("[INFO] Materials Properties :")
         print(f"Es = {E*1e3:.2f} MPa, ")
 
@@ -775,7 +1912,7 @@ if __name__ == "__main__":
     I = (1000 * np.power(24, 3)) * 1e-8  # m4
 
     analysis = BeamAnalysis(E, I)
-    analysis.calculators_force()
+    analysis.calculators_force(verbosity=2)
     analysis.plot_diagram()
 
 """
@@ -0,0 +1,409 @@
+"""
+Plane frame analysis : axial + bending members at any node coordinates
+
+Element matrices of all members are built as one (n, 6, 6) stack, moment
+releases are condensed out statically and the global [K] is assembled as a
+scipy.sparse matrix. [Kff] is reordered with reverse Cuthill-McKee to a narrow
+band before the sparse LU factorization, then every load case is solved as one
+right-hand-side matrix. Member loads use the beam_analysis load classes in
+local axes.
+"""
+
+import sys
+import os
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse import linalg as splinalg
+from tabulate import tabulate
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)  # Add "strd" to sys.path
+
+from beam_analysis import (
+    TaperedBeamB,
+    Load,
+    DistributedLoad,
+    LoadTable,
+    LoadCase,
+    LoadCaseResult,
+)
+
+
+class AxialLoad:
+    """Uniform load along the member axis, N/m, + from end i to end j"""
+
+    def __init__(self, p=0):
+        self.p = p
+
+    def __str__(self):
+        return f"Axial Load\n   Value: {self.p} N/m"
+
+    def equivalent_nodal_reactions(self, L):
+        # [N1, N2] with both ends fixed
+        return np.array([[-self.p * L / 2], [-self.p * L / 2]])
+
+    def scaled(self, factor):
+        return AxialLoad(factor * self.p)
+
+    def axial_force(self, x, L):
+        # Tension + at x of the load between end i and x
+        return -self.p * np.asarray(x, dtype=float)
+
+
+class FrameElements:
+    """Stack of plane frame elements
+    Local DOF [u1, v1, θ1, u2, v2, θ2], x from end i to end j
+    Attributes:
+        i, j: end nodes (n,)
+        E, A, I, L: (n,) Pa, m2, m4, m
+        I2, n: inertia at end j and taper exponent of TaperedBeamB, I2 = I if prismatic
+        c, s: direction cosines of the member axis
+        release: (n, 2) bool, moment release at end i / end j
+        k: (n, 6, 6) local stiffness, released moments condensed out
+        T: (n, 6, 6) global to local rotation
+    """
+
+    def __init__(self, nodes, members, E, A, I, release=None, I2=None, n=3):
+        members = np.asarray(members, dtype=int).reshape(-1, 2)
+        self.i, self.j = members.T
+        I2 = I if I2 is None else I2
+        self.E, self.A, self.I, self.I2, self.n = (
+            np.array(v, dtype=float)
+            for v in np.broadcast_arrays(E, A, I, I2, n, self.i)[:5]
+        )
+        self.tapered = self.I2 != self.I
+        n = len(self.i)
+        self.release = (
+            np.zeros((n, 2), dtype=bool)
+            if release is None
+            else np.asarray(release, dtype=bool).reshape(n, 2)
+        )
+
+        nodes = np.asarray(nodes, dtype=float)
+        dx, dy = (nodes[self.j] - nodes[self.i]).T
+        self.L = np.hypot(dx, dy)
+        if (self.L <= 0).any():
+            raise ValueError(
+                f"Members {np.flatnonzero(self.L <= 0) + 1} have zero length."
+            )
+        self.c, self.s = dx / self.L, dy / self.L
+
+        self.T = np.zeros((n, 6, 6))
+        for r in (0, 3):
+            self.T[:, r, r] = self.T[:, r + 1, r + 1] = self.c
+            self.T[:, r, r + 1] = self.s
+            self.T[:, r + 1, r] = -self.s
+            self.T[:, r + 2, r + 2] = 1
+
+        self.k0 = self.local_stiffness()
+        self.k, _ = self.condense(self.k0)
+
+    def __len__(self):
+        return len(self.L)
+
+    def local_stiffness(self):
+        E, A, I, L = self.E, self.A, self.I, self.L
+        a, b = E * A / L, E * I / L**3
+        z = np.zeros_like(L)
+        k = np.stack(
+            [
+                [a, z, z, -a, z, z],
+                [z, 12 * b, 6 * b * L, z, -12 * b, 6 * b * L],
+                [z, 6 * b * L, 4 * b * L**2, z, -6 * b * L, 2 * b * L**2],
+                [-a, z, z, a, z, z],
+                [z, -12 * b, -6 * b * L, z, 12 * b, -6 * b * L],
+                [z, 6 * b * L, 2 * b * L**2, z, -6 * b * L, 4 * b * L**2],
+            ]
+        )
+        k = k.transpose(2, 0, 1)
+
+        # Bending block of tapered members by quadrature
+        t = self.tapered
+        if t.any():
+            bending = np.ix_(np.flatnonzero(t), [1, 2, 4, 5], [1, 2, 4, 5])
+            k[bending] = TaperedBeamB.stiffness(
+                E[t], self.I[t], self.I2[t], L[t], self.n[t]
+            )
+        return k
+
+    def tapered_element(self, i):
+        return TaperedBeamB(self.E[i], self.I[i], self.I2[i], self.L[i], self.n[i])
+
+    def condense(self, k, q=None):
+        """
+        Static condensation of the released end rotations
+        k : (n, 6, 6) local stiffness without releases
+        q : (n, 6, m) local fixed-end forces, condensed the same way if given
+        Returns condensed k, q
+        """
+        k = k.copy()
+        q = None if q is None else q.copy()
+        for end, c in ((0, 2), (1, 5)):
+            rows = self.release[:, end]
+            if not rows.any():
+                continue
+            kc = k[rows, :, c] / k[rows, c, c][:, None]  # (r, 6)
+            if q is not None:
+                q[rows] -= kc[:, :, None] * q[rows, c][:, None, :]
+            k[rows] -= kc[:, :, None] * k[rows, c][:, None, :]
+            k[rows, c, :] = k[rows, :, c] = 0
+        return k, q
+
+    def dofs(self):
+        # Global DOFs of each member, (n, 6)
+        return np.column_stack(
+            [3 * self.i + r for r in range(3)] + [3 * self.j + r for r in range(3)]
+        )
+
+    def global_stiffness(self):
+        # Tt k T of every member, (n, 6, 6)
+        return self.T.transpose(0, 2, 1) @ self.k @ self.T
+
+
+class Frame:
+    """
+    nodes : (N, 2) node coordinates x, y, m (y up)
+    members : (n, 2) 0-based end nodes i, j of each member
+    supports : {node: (ux, uy, rz)}, 1 = restrained
+    E, A, I : Pa, m2, m4, one value or one per member
+    releases : (n, 2) moment release at end i / end j of each member
+    I2, n : tapered members, I at end j and taper exponent (see TaperedBeamB)
+    Nodal loads R0 : [Fx1, Fy1, M1, Fx2, ...], N, N-m, global axes
+    Member loads : PointLoad/DistributedLoad/ConcentratedMoment in local axes
+    (Down+ is -y local) and AxialLoad, per member
+    """
+
+    def __init__(self, nodes, members, supports, E, A, I, releases=None, I2=None, n=3):
+        self.nodes = np.asarray(nodes, dtype=float)
+        self.elements = FrameElements(self.nodes, members, E, A, I, releases, I2, n)
+        self.ndof = 3 * len(self.nodes)
+
+        restrained = np.zeros((len(self.nodes), 3), dtype=bool)
+        for node, fixity in supports.items():
+            restrained[node] = np.asarray(fixity, dtype=bool)
+        self.fixed = restrained.ravel()
+
+        self.K = self.stiffness_matrix()
+
+        # A rotation connected only to released member ends has no stiffness
+        free = ~self.fixed & (np.abs(self.K.diagonal()) > 0)
+        self.free = free
+        self.factorize()
+
+    def stiffness_matrix(self):
+        ks = self.elements.global_stiffness()
+        dofs = self.elements.dofs()
+        rows = np.repeat(dofs[:, :, None], 6, axis=2)
+        cols = np.repeat(dofs[:, None, :], 6, axis=1)
+        K = sparse.coo_matrix(
+            (ks.ravel(), (rows.ravel(), cols.ravel())), shape=(self.ndof, self.ndof)
+        )
+        return K.tocsr()
+
+    def factorize(self):
+        """
+        Reverse Cuthill-McKee ordering of [Kff], then sparse LU in that order
+        """
+        Kff = self.K[self.free][:, self.free]
+        self.perm = csgraph.reverse_cuthill_mckee(Kff, symmetric_mode=True)
+        Kp = Kff[self.perm][:, self.perm].tocsc()
+        try:
+            self.lu = splinalg.splu(Kp, permc_spec="NATURAL")
+        except RuntimeError:
+            print("Unstable structure. Check the supports and releases of the frame.")
+            raise
+
+    def bandwidth(self):
+        # Half bandwidth of [Kff] before and after reordering
+        Kff = self.K[self.free][:, self.free].tocoo()
+        inverse = np.argsort(self.perm)
+        return (
+            np.abs(Kff.row - Kff.col).max(),
+            np.abs(inverse[Kff.row] - inverse[Kff.col]).max(),
+        )
+
+    def solve_free(self, rhs):
+        x = np.zeros(rhs.shape)
+        x[self.perm] = self.lu.solve(rhs[self.perm])
+        return x
+
+    def gravity(self, w):
+        """
+        Self weight type load w (N/m of member length, global Down+) on every
+        member as local member loads
+        """
+        w = np.broadcast_to(np.asarray(w, dtype=float), (len(self.elements),))
+        c, s, L = self.elements.c, self.elements.s, self.elements.L
+        return [
+            [DistributedLoad(w[i] * c[i], 0, L[i]), AxialLoad(-w[i] * s[i])]
+            for i in range(len(self.elements))
+        ]
+
+    def fixed_end_forces(self, loads):
+        """
+        Local fixed-end forces of every member, (n, 6), releases not condensed
+        """
+        n = len(self.elements)
+        q = np.zeros((n, 6))
+        table = LoadTable.from_loads(
+            [[load for load in member if isinstance(load, Load)] for member in loads]
+        )
+        q[:, [1, 2, 4, 5]] = table.fixed_end_forces(self.elements.L)
+        for i in np.flatnonzero(self.elements.tapered):
+            beam_loads = [load for load in loads[i] if isinstance(load, Load)]
+            q[i, [1, 2, 4, 5]] = self.elements.tapered_element(i).fixed_end_forces(
+                beam_loads
+            )
+        for i, member in enumerate(loads):
+            for load in member:
+                if isinstance(load, AxialLoad):
+                    q[i, [0, 3]] += load.equivalent_nodal_reactions(self.elements.L[i])[
+                        :, 0
+                    ]
+        return q
+
+    def solve(self, cases):
+        """
+        cases : list of LoadCase, loads per member, R0 nodal loads
+        Returns LoadCaseResult, F : (n, 6, m) local member end forces
+        """
+        elements = self.elements
+        dofs = elements.dofs()
+
+        q = np.stack(
+            [
+                (
+                    self.fixed_end_forces(case.loads)
+                    if case.loads
+                    else np.zeros((len(elements), 6))
+                )
+                for case in cases
+            ],
+            axis=-1,
+        )
+        _, QF = elements.condense(elements.k0, q)
+
+        Qf = np.zeros((self.ndof, len(cases)))
+        np.add.at(Qf, dofs, elements.T.transpose(0, 2, 1) @ QF)
+
+        R0 = np.column_stack(
+            [
+                (
+                    np.zeros(self.ndof)
+                    if case.R0 is None
+                    else np.asarray(case.R0, dtype=float)
+                )
+                for case in cases
+            ]
+        )
+
+        # [df] = inv[Kff]([Rf] - [Qff]), [R] = [K][d] + [Qf]
+        d = np.zeros(Qf.shape)
+        d[self.free] = self.solve_free(R0[self.free] - Qf[self.free])
+        R = self.K @ d + Qf
+
+        # Fi = [ki][Ti][ui] + [QFi]
+        F = elements.k @ (elements.T @ d[dofs]) + QF
+
+        return LoadCaseResult(
+            [case.name for case in cases], [case.loads for case in cases], d, R, F
+        )
+
+    def member_actions(self, result, member, numS=21):
+        """
+        Axial force (tension +), shear and bending moment (sagging +) along one
+        member for every case of the result, (numS, m) each, x from end i
+        """
+        L = self.elements.L[member]
+        x = np.linspace(0, L, numS)
+        F = result.F[member]  # (6, m)
+
+        N = np.broadcast_to(-F[0], (numS, F.shape[1])).copy()
+        V = np.broadcast_to(F[1], (numS, F.shape[1])).copy()
+        M = -F[2] + np.outer(x / L, F[5] + F[2])
+        for j, loads in enumerate(result.loads):
+            for load in loads[member] if loads else []:
+                if isinstance(load, AxialLoad):
+                    N[:, j] += load.axial_force(x, L)
+                else:
+                    V[:, j] += load.shear_force(x, L)
+                    M[:, j] += load.bending_moment(x, L)
+        return x, N, V, M
+
+    def design_forces(self, result, numS=21):
+        """
+        Envelope of all cases of the result for each member, in the units of the
+        design scripts : Pu, Tu (kN), Vu (kN), Mu (kN-m)
+        """
+        n = len(self.elements)
+        forces = {key: np.zeros(n) for key in ("Pu", "Tu", "Vu", "Mu")}
+        for i in range(n):
+            x, N, V, M = self.member_actions(result, i, numS)
+            forces["Pu"][i] = max(-N.min(), 0) / 1e3
+            forces["Tu"][i] = max(N.max(), 0) / 1e3
+            forces["Vu"][i] = np.abs(V).max() / 1e3
+            forces["Mu"][i] = np.abs(M).max() / 1e3
+        return forces
+
+    def report(self, result, numS=21):
+        forces = self.design_forces(result, numS)
+        rows = [
+            [i + 1, self.elements.i[i] + 1, self.elements.j[i] + 1, self.elements.L[i]]
+            + [forces[key][i] for key in ("Pu", "Tu", "Vu", "Mu")]
+            for i in range(len(self.elements))
+        ]
+        headers = ["Member", "i", "j", "L, m", "Pu, kN", "Tu, kN", "Vu, kN", "Mu, kN-m"]
+        return tabulate(rows, headers=headers, floatfmt=".2f", tablefmt="psql")
+
+
+# =========================================================================================
+# Main Functionality
+if __name__ == "__main__":
+    import time
+
+    # Warehouse frame line : gable bays, 6 m eave, 1.5 m rise, 20 m bay
+    bays, span, eave, rise = 60, 20.0, 6.0, 1.5
+    nodes, members, supports = [], [], {}
+    for b in range(bays + 1):
+        x0 = b * span
+        nodes.append([x0, 0.0])  # column base
+        nodes.append([x0, eave])  # eave
+        supports[2 * b] = (1, 1, 0)  # pinned base
+    for b in range(bays):
+        nodes.append([b * span + span / 2, eave + rise])  # ridge
+    ridge = 2 * (bays + 1)
+
+    for b in range(bays + 1):
+        members.append([2 * b, 2 * b + 1])  # column
+    for b in range(bays):
+        members.append([2 * b + 1, ridge + b])  # rafter
+        members.append([ridge + b, 2 * b + 3])
+
+    n = len(members)
+    E, A, I = 200e9, 8.4e-3, 2.35e-4  # H-400x200
+    frame = Frame(nodes, members, supports, E, A, I)
+
+    dead = frame.gravity([0.0] * (bays + 1) + [6.0e3] * (2 * bays))  # N/m
+    live = frame.gravity([0.0] * (bays + 1) + [4.5e3] * (2 * bays))
+    wind = [0.0] * len(frame.nodes) * 3
+    wind[3] = 20e3  # N, at the first eave
+
+    t = time.time()
+    result = frame.solve(
+        [LoadCase("D", dead), LoadCase("L", live), LoadCase("W", [], wind)]
+    )
+    combos = result.combine(
+        {
+            "1.4D+1.7L": {"D": 1.4, "L": 1.7},
+            "0.75(1.4D+1.7L+1.7W)": {"D": 1.05, "L": 1.275, "W": 1.275},
+        }
+    )
+    print(f"{n} members, {frame.free.sum()} DOFs solved in {time.time() - t:.4f} s")
+    print(f"Half bandwidth before / after RCM : {frame.bandwidth()}")
+    print(frame.report(combos))
+
+"""
+python analysis/frame_analysis.py
+"""
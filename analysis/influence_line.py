@@ -0,0 +1,164 @@
+"""
+Influence lines and moving-load envelopes for continuous beams
+
+A unit point load (1 N, Down+) is placed at every position of a grid along the
+beam. All positions are solved as one right-hand-side matrix with the stiffness
+factorization of LoadCaseAnalysis, then an axle group is swept over the
+influence line by interpolation instead of re-solving at every position.
+"""
+
+import sys
+import os
+import numpy as np
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)  # Add "strd" to sys.path
+
+from beam_analysis import BeamB, TaperedBeamB, PointLoad, LoadCaseAnalysis
+
+
+class MovingLoad:
+    """Axle group
+    Attributes:
+        P: Axle loads, N, Down+
+        offsets: Distance of each axle behind the lead axle, m
+    """
+
+    def __init__(self, P, offsets):
+        self.P = np.asarray(P, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=float)
+        if self.P.shape != self.offsets.shape:
+            raise ValueError("P and offsets must have the same length.")
+
+    def __str__(self):
+        return f"Moving Load\n   Axles: {self.P} N\n   Offsets: {self.offsets} m"
+
+
+class InfluenceLine:
+    """
+    spans, supports : as BeamAnalysis
+    elements : list of BeamB
+    step : spacing of unit load positions, m
+    Spans and nodes are 0-based : span i runs from node i to node i+1
+    """
+
+    def __init__(self, spans, supports, elements, step=0.01):
+        self.spans = np.asarray(spans, dtype=float)
+        self.elements = elements
+        self.nodes_x = np.concatenate([[0.0], np.cumsum(self.spans)])
+
+        Ltotal = self.nodes_x[-1]
+        self.x = np.linspace(0, Ltotal, int(np.ceil(Ltotal / step)) + 1)
+
+        # Span and local position of each unit load
+        self.span = np.clip(
+            np.searchsorted(self.nodes_x, self.x, side="right") - 1,
+            0,
+            len(self.spans) - 1,
+        )
+        self.a = self.x - self.nodes_x[self.span]
+
+        self.analysis = LoadCaseAnalysis(spans, supports, elements)
+        self.solve()
+
+    def solve(self):
+        n = len(self.elements)
+        m = len(self.x)
+        self.dofs = 2 * np.arange(n)[:, None] + np.arange(4)  # (n, 4)
+
+        # FEF of the unit load at every position, (m, 4)
+        L = self.spans[self.span]
+        self.QF = PointLoad(1.0, self.a).equivalent_nodal_reactions(L)[:, 0, :].T
+        for span, element in enumerate(self.elements):
+            if isinstance(element, TaperedBeamB):
+                for p in np.flatnonzero(self.span == span):
+                    self.QF[p] = element.fixed_end_forces([PointLoad(1.0, self.a[p])])
+
+        Qf = np.zeros((2 * (n + 1), m))
+        np.add.at(Qf, (self.dofs[self.span], np.arange(m)[:, None]), self.QF)
+
+        # One factorization, m right-hand sides
+        free = self.analysis.free
+        self.dy = np.zeros(Qf.shape)
+        self.dy[free] = self.analysis.dr_calculator.solve(-Qf[free])
+        self.R = self.analysis.K @ self.dy + Qf
+
+    def end_forces(self, span):
+        """
+        Member end forces [V1, M1, V2, M2] of one span for every unit load position
+        """
+        F = self.elements[span].k @ self.dy[self.dofs[span]]  # (4, m)
+        loaded = self.span == span
+        F[:, loaded] += self.QF[loaded].T
+        return F
+
+    def reaction(self, node, dof=0):
+        """
+        node : 0-based node number
+        dof : 0 = vertical force, 1 = moment
+        """
+        return self.R[2 * node + dof]
+
+    def shear(self, span, x):
+        """
+        Shear at section x (m from the left node of the span)
+        """
+        F = self.end_forces(span)
+        loaded = self.span == span
+        L = self.spans[span]
+        V0 = np.where(loaded, PointLoad(1.0, self.a).shear_force(x, L), 0.0)
+        return F[0] + V0
+
+    def moment(self, span, x):
+        """
+        Bending moment at section x (m from the left node of the span), sagging +
+        """
+        F = self.end_forces(span)
+        loaded = self.span == span
+        L = self.spans[span]
+        M0 = np.where(loaded, PointLoad(1.0, self.a).bending_moment(x, L), 0.0)
+        return -F[1] + (F[3] + F[1]) / L * x + M0
+
+    def envelope(self, values, train, step=None):
+        """
+        values : influence line ordinates at self.x
+        train : MovingLoad, entering at the left end and leaving at the right end
+        Returns max, lead axle position of max, min, lead axle position of min
+        """
+        step = self.x[1] - self.x[0] if step is None else step
+        Ltotal = self.x[-1]
+        lead = np.arange(0, Ltotal + train.offsets.max() + step, step)
+
+        effect = np.zeros(len(lead))
+        for P, offset in zip(train.P, train.offsets):
+            effect += P * np.interp(lead - offset, self.x, values, left=0, right=0)
+
+        imax, imin = np.argmax(effect), np.argmin(effect)
+        return effect[imax], lead[imax], effect[imin], lead[imin]
+
+
+# =========================================================================================
+# Main Functionality
+if __name__ == "__main__":
+    E = 200e9  # Pa
+    I = 2e-4  # m4
+    spans = [20, 25, 20]
+    supports = [2, 2, 2, 2]
+
+    elements = [BeamB(E, I, L) for L in spans]
+    il = InfluenceLine(spans, supports, elements, step=0.01)
+
+    # Two-axle crane wheel group, 100 kN each, 3.6 m wheel base
+    train = MovingLoad([100e3, 100e3], [0, 3.6])
+
+    Mmax, xmax, Mmin, xmin = il.envelope(il.moment(1, 12.5), train)
+    print(f"Span 2 midspan : maxM = {Mmax/1000:.2f}, minM = {Mmin/1000:.2f} ,kN-m")
+    print(f"Lead axle at x = {xmax:.2f}, {xmin:.2f} ,m")
+
+    Rmax, xmax, Rmin, xmin = il.envelope(il.reaction(1), train)
+    print(f"Node 2 : maxR = {Rmax/1000:.2f}, minR = {Rmin/1000:.2f} ,kN")
+
+"""
+python analysis/influence_line.py
+"""
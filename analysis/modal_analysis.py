@@ -0,0 +1,153 @@
+"""
+Natural frequencies and mode shapes of continuous beams
+
+[K] and the consistent mass matrix [M] are assembled as scipy.sparse matrices
+with the same element scatter. The lowest modes of [Kff]{φ} = ω²[Mff]{φ} are
+extracted with the shift-invert Lanczos solver (eigsh, sigma = 0), which only
+factorizes the banded [Kff] and never builds a dense matrix. Small systems fall
+back to the dense generalized eigh.
+"""
+
+import sys
+import os
+import numpy as np
+from scipy import linalg
+from scipy.sparse import linalg as splinalg
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)  # Add "strd" to sys.path
+
+from beam_analysis import (
+    BeamB,
+    BeamElements,
+    ForcesCalculator,
+    DisplacementReactionAssembly,
+)
+
+
+class ModalAnalysis:
+    """
+    spans, supports : as BeamAnalysis
+    elements : list of BeamB (or BeamElements) with mass per length m, kg/m
+    m : mass per length of each span, kg/m, replaces the element masses if given
+    """
+
+    # Free DOFs solved with the dense eigh
+    MAX_DENSE_DOFS = 200
+
+    def __init__(self, spans, supports, elements, m=None):
+        self.spans = list(spans)
+        self.elements = BeamElements.from_elements(elements)
+        if m is not None:
+            self.elements = BeamElements(
+                self.elements.E, self.elements.I, self.elements.L, m
+            )
+        if not (self.elements.m > 0).any():
+            raise ValueError("Mass per length m must be given for modal analysis.")
+
+        forces = ForcesCalculator(self.spans, self.elements, None)
+        self.K = forces.sparse_stiffness_matrix()
+        self.M = forces.sparse_mass_matrix()
+
+        dr_assembly = DisplacementReactionAssembly(spans, supports, elements, None)
+        self.free, self.fixed = dr_assembly.dof_masks()
+
+    def solve(self, modes=5):
+        """
+        modes : number of lowest modes
+        Returns frequencies (Hz) and mode shapes (2N, modes) normalized to
+        {φ}T[M]{φ} = 1, restrained DOFs are 0
+        """
+        Kff = self.K[self.free][:, self.free]
+        Mff = self.M[self.free][:, self.free]
+        nf = Kff.shape[0]
+        modes = min(modes, nf)
+
+        if nf <= self.MAX_DENSE_DOFS or modes >= nf - 1:
+            try:
+                w2, phi = linalg.eigh(
+                    Kff.toarray(), Mff.toarray(), subset_by_index=[0, modes - 1]
+                )
+            except linalg.LinAlgError:
+                print("Unstable structure or mass matrix is singular.")
+                raise
+        else:
+            # Shift-invert about 0 : largest 1/ω² are the lowest modes
+            w2, phi = splinalg.eigsh(
+                Kff.tocsc(), k=modes, M=Mff.tocsc(), sigma=0, which="LM"
+            )
+            order = np.argsort(w2)
+            w2, phi = w2[order], phi[:, order]
+
+        self.omega = np.sqrt(np.clip(w2, 0, None))  # rad/s
+        self.frequency = self.omega / (2 * np.pi)  # Hz
+        self.period = np.divide(
+            1,
+            self.frequency,
+            out=np.full_like(self.frequency, np.inf),
+            where=self.frequency > 0,
+        )
+
+        self.phi = np.zeros((len(self.free), modes))
+        self.phi[self.free] = phi
+        return self.frequency, self.phi
+
+    def participation(self):
+        """
+        Modal participation factor and effective mass (kg) for vertical excitation
+        """
+        r = np.zeros(len(self.free))
+        r[0::2] = 1.0  # unit vertical displacement of every node
+        r[self.fixed] = 0
+        Gamma = self.phi.T @ (self.M @ r)
+        return Gamma, Gamma**2
+
+    def mode_shape(self, mode, numS=101):
+        """
+        Deflected shape of one mode along each span by Hermite interpolation,
+        scaled to max |w| = 1
+        Returns lists of x (m, from the left node of the span) and w
+        """
+        X, W = [], []
+        for i, L in enumerate(self.elements.L):
+            d1, θ1, d2, θ2 = self.phi[2 * i : 2 * i + 4, mode]
+            x = np.linspace(0, L, numS)
+            s = x / L
+            w = (
+                (1 - 3 * s**2 + 2 * s**3) * d1
+                + L * (s - 2 * s**2 + s**3) * θ1
+                + (3 * s**2 - 2 * s**3) * d2
+                + L * (s**3 - s**2) * θ2
+            )
+            X.append(x)
+            W.append(w)
+        peak = max(np.abs(w).max() for w in W)
+        return X, [w / peak for w in W] if peak > 0 else W
+
+
+# =========================================================================================
+# Main Functionality
+if __name__ == "__main__":
+    E = 200e9  # Pa
+    I = 2e-4  # m4
+    m = 300  # kg/m, self weight + superimposed mass
+    spans = [8, 8, 8]
+    supports = [2, 2, 2, 2]
+
+    # Each span divided in 50 elements, intermediate nodes free
+    div = 50
+    elements = [BeamB(E, I, L / div, m=m) for L in spans for _ in range(div)]
+    nodes = [supports[0]]
+    for support in supports[1:]:
+        nodes += [3] * (div - 1) + [support]
+
+    modal = ModalAnalysis([element.L for element in elements], nodes, elements)
+    f, phi = modal.solve(modes=4)
+    Gamma, meff = modal.participation()
+    for j in range(len(f)):
+        print(f"Mode {j+1} : f = {f[j]:.3f} Hz, Meff = {meff[j]:.1f} kg")
+
+"""
+python analysis/modal_analysis.py
+"""
@@ -0,0 +1,147 @@
+"""
+Pattern (skip-span) live-load envelope for continuous beams
+
+Live load on any subset of the n spans is the sum of the unit-span responses
+of that subset. One load case per span is solved with a single stiffness
+factorization, then at each section the max (min) over all 2^n patterns is the
+dead load response plus every positive (negative) span contribution.
+"""
+
+import sys
+import os
+import numpy as np
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)  # Add "strd" to sys.path
+
+from beam_analysis import (
+    BeamB,
+    DistributedLoad,
+    LoadCase,
+    LoadCaseAnalysis,
+    DisplacementReactionAssembly,
+)
+
+
+class PatternLoadEnvelope:
+    """
+    spans, supports : as BeamAnalysis
+    elements : list of BeamB
+    dead : loads in each stretch, always present (factored)
+    live : live load of each span, N/m, full span, a number or one value per span
+    numS : sections per span where the envelope is evaluated
+    """
+
+    def __init__(self, spans, supports, elements, dead, live, numS=101):
+        self.spans = list(spans)
+        self.supports = supports
+        self.elements = elements
+        self.dead = dead
+        self.live = np.broadcast_to(np.asarray(live, dtype=float), (len(spans),))
+        self.x = [np.linspace(0, L, numS) for L in self.spans]
+
+        n = len(self.spans)
+        cases = [LoadCase("D", dead)]
+        for j in range(n):
+            loads = [[] for _ in range(n)]
+            loads[j].append(DistributedLoad(self.live[j], 0, self.spans[j]))
+            cases.append(LoadCase(f"L{j+1}", loads))
+
+        # One factorization, dead + one live case per span
+        self.cases = LoadCaseAnalysis(spans, supports, elements).solve(cases)
+
+    def contributions(self, i):
+        """
+        Shear and moment of every case at the sections of span i, (numS, 1 + n)
+        column 0 = dead, column j + 1 = live load on span j
+        """
+        L, x = self.spans[i], self.x[i]
+        F = self.cases.F[i]  # (4, 1 + n)
+
+        V = np.broadcast_to(F[0], (len(x), F.shape[1])).copy()
+        M = -F[1] + np.outer(x / L, F[3] + F[1])
+
+        # Span loads of this stretch : dead loads and the live case of span i
+        for load in self.dead[i]:
+            V[:, 0] += load.shear_force(x, L)
+            M[:, 0] += load.bending_moment(x, L)
+        live = DistributedLoad(self.live[i], 0, L)
+        V[:, i + 1] += live.shear_force(x, L)
+        M[:, i + 1] += live.bending_moment(x, L)
+        return V, M
+
+    @staticmethod
+    def select(values):
+        # dead + sum of positive / negative live contributions
+        live = values[..., 1:]
+        return (
+            values[..., 0] + np.clip(live, 0, None).sum(axis=-1),
+            values[..., 0] + np.clip(live, None, 0).sum(axis=-1),
+        )
+
+    def envelope(self):
+        """
+        Returns per span lists of Vmax, Vmin, Mmax, Mmin at self.x (N, N-m, sagging +)
+        """
+        Vmax, Vmin, Mmax, Mmin = [], [], [], []
+        for i in range(len(self.spans)):
+            V, M = self.contributions(i)
+            vmax, vmin = self.select(V)
+            mmax, mmin = self.select(M)
+            Vmax.append(vmax)
+            Vmin.append(vmin)
+            Mmax.append(mmax)
+            Mmin.append(mmin)
+        return Vmax, Vmin, Mmax, Mmin
+
+    def reactions(self):
+        """
+        Rmax, Rmin of the restrained DOFs [F1, M1, F2, M2, ...], N, N-m
+        free DOFs are returned as 0
+        """
+        dr_assembly = DisplacementReactionAssembly(
+            self.spans, self.supports, self.elements, None
+        )
+        free, fixed = dr_assembly.dof_masks()
+        Rmax, Rmin = self.select(self.cases.R)
+        Rmax[free], Rmin[free] = 0, 0
+        return Rmax, Rmin
+
+    def pattern(self, i, k, which="max"):
+        """
+        Spans loaded with live load for the max (min) moment at section k of span i
+        """
+        V, M = self.contributions(i)
+        live = M[k, 1:]
+        return np.flatnonzero(live > 0 if which == "max" else live < 0) + 1
+
+
+# =========================================================================================
+# Main Functionality
+if __name__ == "__main__":
+    E = 200e9  # Pa
+    I = 2e-4  # m4
+    spans = [6, 6, 6, 6, 6]
+    supports = [2, 2, 2, 2, 2, 2]
+
+    elements = [BeamB(E, I, L) for L in spans]
+    dead = [[DistributedLoad(1.4 * 10e3, 0, L)] for L in spans]  # N/m
+    live = 1.7 * 15e3  # N/m
+
+    envelope = PatternLoadEnvelope(spans, supports, elements, dead, live)
+    Vmax, Vmin, Mmax, Mmin = envelope.envelope()
+    Rmax, Rmin = envelope.reactions()
+
+    for i in range(len(spans)):
+        print(
+            f"Span {i+1} : maxM = {Mmax[i].max()/1000:.2f}, minM = {Mmin[i].min()/1000:.2f} ,kN-m"
+        )
+        print(
+            f"Span {i+1} : maxQ = {Vmax[i].max()/1000:.2f}, minQ = {Vmin[i].min()/1000:.2f} ,kN"
+        )
+    print(f"Reactions max : {Rmax[::2]/1000} kN")
+
+"""
+python analysis/pattern_load.py
+"""
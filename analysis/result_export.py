@@ -0,0 +1,86 @@
+"""
+Streaming export of diagram and result data
+
+A chunk is a dict of equal length 1-D NumPy columns, e.g. one span of a beam
+{"span", "x", "V", "M", "delta"}. Writers take any iterable of chunks and write
+them one at a time, so only the current chunk is held in memory.
+    .csv     : rows appended per chunk, header from the first chunk
+    .npz     : one .npy member per column and chunk, "<column>_<chunk>.npy"
+    .parquet : one row group per chunk, needs pyarrow
+"""
+
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+
+def write_csv(chunks, path, float_format="%.6g"):
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for k, chunk in enumerate(chunks):
+            pd.DataFrame(chunk).to_csv(
+                f, header=k == 0, index=False, float_format=float_format
+            )
+            rows += len(next(iter(chunk.values())))
+    return rows
+
+
+def write_npz(chunks, path, compress=False):
+    rows = 0
+    mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, "w", compression=mode, allowZip64=True) as zf:
+        for k, chunk in enumerate(chunks):
+            for name, values in chunk.items():
+                with zf.open(f"{name}_{k:06d}.npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, np.asarray(values), allow_pickle=False)
+            rows += len(next(iter(chunk.values())))
+    return rows
+
+
+def iter_npz(path):
+    """
+    Chunks back from write_npz, one at a time
+    """
+    with np.load(path, allow_pickle=False) as data:
+        chunks = {}
+        for key in data.files:
+            name, k = key.rsplit("_", 1)
+            chunks.setdefault(int(k), []).append(name)
+        for k in sorted(chunks):
+            yield {name: data[f"{name}_{k:06d}"] for name in chunks[k]}
+
+
+def write_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow : pip install pyarrow")
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.table({name: np.asarray(v) for name, v in chunk.items()})
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+WRITERS = {".csv": write_csv, ".npz": write_npz, ".parquet": write_parquet}
+
+
+def write_chunks(chunks, path):
+    """
+    Writer chosen from the file extension, returns the number of rows written
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unknown export format {ext!r}, use {', '.join(WRITERS)}")
+    return WRITERS[ext](chunks, path)
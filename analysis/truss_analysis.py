@@ -0,0 +1,285 @@
+"""
+Plane truss analysis and angle member design
+
+Pin-jointed members, two DOF per node [ux, uy]. The global [K] is assembled as
+a scipy.sparse matrix from one (n, 4, 4) stack of member matrices, [Kff] is
+factorized once with sparse LU and every load case is solved as one
+right-hand-side matrix. Member axial forces of all cases then go to the angle
+design, which checks every member group against the whole angle table at once
+with Compression label 3 and picks the lightest passing section.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import linalg as splinalg
+from tabulate import tabulate
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)  # Add "strd" to sys.path
+
+from beam_analysis import LoadCase, LoadCaseResult
+from applications.compression import Compression
+from app.section_generator import MaterialProperties
+
+
+class Truss:
+    """
+    nodes : (N, 2) node coordinates x, y, m (y up)
+    members : (n, 2) 0-based end nodes i, j of each member
+    supports : {node: (ux, uy)}, 1 = restrained
+    E, A : Pa, m2, one value or one per member
+    Nodal loads R0 : [Fx1, Fy1, Fx2, Fy2, ...], N, global axes
+    """
+
+    def __init__(self, nodes, members, supports, E, A):
+        self.nodes = np.asarray(nodes, dtype=float)
+        members = np.asarray(members, dtype=int).reshape(-1, 2)
+        self.i, self.j = members.T
+        self.E, self.A = (
+            np.array(v, dtype=float) for v in np.broadcast_arrays(E, A, self.i)[:2]
+        )
+        self.ndof = 2 * len(self.nodes)
+
+        dx, dy = (self.nodes[self.j] - self.nodes[self.i]).T
+        self.L = np.hypot(dx, dy)
+        if (self.L <= 0).any():
+            raise ValueError(
+                f"Members {np.flatnonzero(self.L <= 0) + 1} have zero length."
+            )
+        self.c, self.s = dx / self.L, dy / self.L
+        self.dofs = np.column_stack(
+            [2 * self.i, 2 * self.i + 1, 2 * self.j, 2 * self.j + 1]
+        )  # (n, 4)
+
+        restrained = np.zeros((len(self.nodes), 2), dtype=bool)
+        for node, fixity in supports.items():
+            restrained[node] = np.asarray(fixity, dtype=bool)
+        self.fixed = restrained.ravel()
+        self.free = ~self.fixed
+
+        self.K = self.stiffness_matrix()
+        self.factorize()
+
+    def __len__(self):
+        return len(self.L)
+
+    def stiffness_matrix(self):
+        # EA/L [cc cs -cc -cs ; ...] of every member, (n, 4, 4)
+        t = np.column_stack([-self.c, -self.s, self.c, self.s])  # (n, 4)
+        ks = (self.E * self.A / self.L)[:, None, None] * t[:, :, None] * t[:, None, :]
+        rows = np.repeat(self.dofs[:, :, None], 4, axis=2)
+        cols = np.repeat(self.dofs[:, None, :], 4, axis=1)
+        K = sparse.coo_matrix(
+            (ks.ravel(), (rows.ravel(), cols.ravel())), shape=(self.ndof, self.ndof)
+        )
+        return K.tocsr()
+
+    def factorize(self):
+        Kff = self.K[self.free][:, self.free].tocsc()
+        try:
+            self.lu = splinalg.splu(Kff)
+        except RuntimeError:
+            print("Unstable structure. Check the supports and members of the truss.")
+            raise
+
+    def solve(self, cases):
+        """
+        cases : list of LoadCase with nodal loads R0 (loads are not used)
+        Returns LoadCaseResult, F : (n, m) member axial force, N, tension +
+        """
+        R0 = np.column_stack(
+            [
+                (
+                    np.zeros(self.ndof)
+                    if case.R0 is None
+                    else np.asarray(case.R0, dtype=float)
+                )
+                for case in cases
+            ]
+        )
+
+        d = np.zeros(R0.shape)
+        d[self.free] = self.lu.solve(R0[self.free])
+        R = self.K @ d
+
+        # N = EA/L * elongation
+        t = np.column_stack([-self.c, -self.s, self.c, self.s])
+        F = (self.E * self.A / self.L)[:, None] * np.einsum(
+            "nk,nkm->nm", t, d[self.dofs]
+        )
+
+        loads = [[[] for _ in range(len(self))] for _ in cases]
+        return LoadCaseResult([case.name for case in cases], loads, d, R, F)
+
+
+class AngleDesign:
+    """
+    Lightest angle of each member group from a whole angle table
+    df : Equal_Angles.csv or Double_Equal_Angles.csv, A (cm2), rx, ry (cm), wt (kg/m)
+    Single angles : compression by Compression label 3 with rx (leg axis),
+    tension slenderness with rv. Double angles : KL/r with min(rx, ry).
+    """
+
+    def __init__(self, df, materials, limit_c=200, limit_t=300, øt=0.9):
+        self.df = df.reset_index(drop=True)
+        self.compression = Compression(materials)
+        self.Fy = materials.Fy
+        self.limit_c = limit_c
+        self.limit_t = limit_t
+        self.øt = øt
+
+        self.A = self.df["A"].to_numpy(dtype=float)  # cm2
+        self.wt = self.df["wt"].to_numpy(dtype=float)  # kg/m
+        rx = self.df["rx"].to_numpy(dtype=float)
+        ry = self.df["ry"].to_numpy(dtype=float)
+        self.single = "rv" in self.df.columns
+        if self.single:
+            self.rc, self.rt = rx, self.df["rv"].to_numpy(dtype=float)
+        else:
+            self.rc = self.rt = np.minimum(rx, ry)
+
+    def capacity(self, L, K=1.0):
+        """
+        L : (g,) member lengths, m
+        Returns øPn compression, øTn tension (kN) and KL/r, (g, s) for s sections
+        """
+        L = np.asarray(L, dtype=float)[:, None]
+        if self.single:
+            øPn, d = self.compression.angle_capacity(L, self.rc, self.A)
+        else:
+            d = np.floor(K * L * 100 / self.rc)
+            øPn = (
+                self.compression.øc * self.compression.critical_stress(d) * self.A / 10
+            )
+        øTn = np.broadcast_to(self.øt * self.Fy * self.A / 10, øPn.shape)  # kN
+        return øPn, øTn, d
+
+    def select(self, N, L, groups):
+        """
+        N : (n, m) member axial force of every case, N, tension +
+        L : (n,) member lengths, m
+        groups : (n,) group label of each member, one section per group
+        Returns DataFrame, one row per group
+        """
+        N = np.asarray(N, dtype=float).reshape(len(L), -1) / 1e3  # kN
+        L = np.asarray(L, dtype=float)
+        groups = np.asarray(groups)
+        labels, index = np.unique(groups, return_inverse=True)
+        g = len(labels)
+
+        # Governing forces and length of each group
+        Pu = np.zeros(g)
+        Tu = np.zeros(g)
+        Lg = np.zeros(g)
+        np.maximum.at(Pu, index, np.clip(-N.min(axis=1), 0, None))
+        np.maximum.at(Tu, index, np.clip(N.max(axis=1), 0, None))
+        np.maximum.at(Lg, index, L)
+
+        øPn, øTn, d = self.capacity(Lg)  # (g, s)
+        ok = (
+            (øPn >= Pu[:, None])
+            & (øTn >= Tu[:, None])
+            & (d <= self.limit_c)
+            & (Lg[:, None] * 100 / self.rt <= self.limit_t)
+        )
+
+        # Lightest passing section of each group
+        weight = np.where(ok, self.wt, np.inf)
+        best = np.argmin(weight, axis=1)
+        found = ok[np.arange(g), best]
+
+        rows = []
+        for k, label in enumerate(labels):
+            s = best[k]
+            section = self.df.iloc[s]
+            rows.append(
+                {
+                    "group": label,
+                    "members": int((index == k).sum()),
+                    "L": Lg[k],
+                    "Pu": Pu[k],
+                    "Tu": Tu[k],
+                    "section": (
+                        f"L{section['AxB']}x{section['t']:g}" if found[k] else None
+                    ),
+                    "wt": self.wt[s] if found[k] else np.nan,
+                    "øPn": øPn[k, s] if found[k] else np.nan,
+                    "øTn": øTn[k, s] if found[k] else np.nan,
+                    "KL/r": d[k, s] if found[k] else np.nan,
+                    "ratio": (
+                        max(Pu[k] / øPn[k, s], Tu[k] / øTn[k, s])
+                        if found[k]
+                        else np.nan
+                    ),
+                }
+            )
+        return pd.DataFrame(rows)
+
+
+# =========================================================================================
+# Main Functionality
+if __name__ == "__main__":
+    # Pratt roof truss : 12 panels of 1.5 m, 1.8 m deep
+    panels, p, h = 12, 1.5, 1.8
+    bottom = [[k * p, 0.0] for k in range(panels + 1)]
+    top = [[k * p, h] for k in range(1, panels)]
+    nodes = bottom + top
+    t = lambda k: panels + k  # top node above bottom node k, 1 <= k <= panels-1
+
+    members, groups = [], []
+    for k in range(panels):
+        members.append([k, k + 1])
+        groups.append("bottom chord")
+    for k in range(1, panels - 1):
+        members.append([t(k), t(k + 1)])
+        groups.append("top chord")
+    members += [[0, t(1)], [panels, t(panels - 1)]]
+    groups += ["end diagonal", "end diagonal"]
+    for k in range(1, panels):
+        members.append([k, t(k)])
+        groups.append("vertical")
+    for k in range(1, panels // 2):
+        members += [[t(k), k + 1], [t(panels - k), panels - k - 1]]
+        groups += ["diagonal", "diagonal"]
+
+    truss = Truss(nodes, members, {0: (1, 1), panels: (0, 1)}, 200e9, 10e-4)
+
+    # Roof loads at top chord nodes, N
+    dead = np.zeros(truss.ndof)
+    live = np.zeros(truss.ndof)
+    wind = np.zeros(truss.ndof)
+    for k in range(1, panels):
+        dead[2 * t(k) + 1] = -4.0e3
+        live[2 * t(k) + 1] = -3.0e3
+        wind[2 * t(k) + 1] = 6.0e3  # uplift
+
+    result = truss.solve(
+        [
+            LoadCase("D", None, dead),
+            LoadCase("L", None, live),
+            LoadCase("W", None, wind),
+        ]
+    )
+    combos = result.combine(
+        {
+            "1.4D+1.7L": {"D": 1.4, "L": 1.7},
+            "0.9D+1.3W": {"D": 0.9, "W": 1.3},
+        }
+    )
+
+    df = pd.read_csv("data/sections/Equal_Angles.csv", encoding="utf-8-sig")
+    design = AngleDesign(df, MaterialProperties(Fy=250, Es=200000))
+    table = design.select(combos.F, truss.L, groups)
+    print(
+        tabulate(
+            table, headers="keys", floatfmt=".2f", tablefmt="psql", showindex=False
+        )
+    )
+
+"""
+python analysis/truss_analysis.py
+"""
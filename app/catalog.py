@@ -0,0 +1,807 @@
+"""
+Compiled section catalogs
+
+Every CSV in data/sections is parsed once into a NumPy structured array and
+saved as .npy in data/sections/.cache. manifest.json keeps the size, mtime and
+sha256 of each source CSV, a catalog is recompiled only when its CSV changed.
+Catalogs are then opened with np.load(mmap_mode="r"), so loading costs a file
+map instead of a CSV parse and every process shares the same pages.
+
+SectionCatalog puts every section family in one schema of mm units, with an
+O(1) designation index and SectionRow views, see SCHEMA and FAMILIES. Torsion
+and LTB properties are derived for every row as extra columns, see DERIVED.
+
+python app/catalog.py            # compile what changed
+python app/catalog.py --force    # compile everything
+"""
+
+import os
+import csv
+import json
+import bisect
+import hashlib
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SECTIONS = os.path.join(ROOT, "data", "sections")
+CACHE = os.path.join(SECTIONS, ".cache")
+MANIFEST = os.path.join(CACHE, "manifest.json")
+
+# Bumped when parse_csv, FAMILIES or dominance change, older caches are then
+# recompiled
+FORMAT = 3
+
+# Opened catalogs of this process
+_loaded = {}
+
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_manifest():
+    try:
+        with open(MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_manifest(manifest):
+    tmp = f"{MANIFEST}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, MANIFEST)
+
+
+def parse_csv(path):
+    """
+    CSV to structured array
+    Returns array, units (None if the file has no unit row), skipped line numbers
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        header, *rows = [row for row in csv.reader(f) if row]
+
+    # Lines with a wrong number of fields cannot be aligned to the header
+    skipped = [k + 2 for k, row in enumerate(rows) if len(row) != len(header)]
+    if skipped:
+        print(f"[WARN] {os.path.basename(path)} : skipped malformed lines {skipped}")
+    df = pd.DataFrame(
+        [[v.strip() for v in row] for row in rows if len(row) == len(header)],
+        columns=[c.strip() for c in header],
+    ).replace("", None)
+
+    # Unit row : 2nd line of the file, no number in any property column
+    # Thousands separators as in "1,050" are dropped
+    units = None
+    numbers = df.iloc[:, 1:].apply(
+        lambda column: pd.to_numeric(column.str.replace(",", ""), errors="coerce")
+    )
+    if len(df) > 1 and numbers.iloc[0].isna().all() and numbers.iloc[1].notna().any():
+        units = df.iloc[0].fillna("").tolist()
+        df, numbers = df.iloc[1:], numbers.iloc[1:]
+
+    # Property columns as float64, designation and text columns as unicode
+    fields = []
+    for k, name in enumerate(df.columns):
+        values = numbers.iloc[:, k - 1] if k > 0 else None
+        if values is not None and values.notna().sum() >= df.iloc[:, k].notna().sum():
+            fields.append((name, values.to_numpy(dtype=float)))
+        else:
+            text = df.iloc[:, k].fillna("").to_numpy(dtype=str)
+            fields.append((name, text))
+
+    dtype = [(name, values.dtype) for name, values in fields]
+    array = np.empty(len(df), dtype=dtype)
+    for name, values in fields:
+        array[name] = values
+    return array, units, skipped
+
+
+def compile_catalog(section, manifest=None, force=False):
+    """
+    section : CSV file name in data/sections, e.g. "H-Sections.csv"
+    Returns True if the .npy was (re)written
+    """
+    source = os.path.join(SECTIONS, section)
+    target = os.path.join(CACHE, os.path.splitext(section)[0] + ".npy")
+    update = manifest is None
+    manifest = read_manifest() if manifest is None else manifest
+
+    stat = os.stat(source)
+    entry = manifest.get(section, {})
+    fresh = (
+        entry.get("size") == stat.st_size
+        and entry.get("mtime") == stat.st_mtime_ns
+        and entry.get("format") == FORMAT
+    )
+    if not force and os.path.exists(target) and fresh:
+        return False
+
+    digest = sha256(source)
+    same = entry.get("sha256") == digest and entry.get("format") == FORMAT
+    if not force and os.path.exists(target) and same:
+        # Touched but not changed
+        entry.update(size=stat.st_size, mtime=stat.st_mtime_ns)
+    else:
+        array, units, skipped = parse_csv(source)
+        os.makedirs(CACHE, exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(tmp, target)
+        manifest[section] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha256": digest,
+            "format": FORMAT,
+            "rows": len(array),
+            "columns": list(array.dtype.names),
+            "units": units,
+            "skipped": skipped,
+        }
+        if section in FAMILIES:
+            # Pareto frontier of the section table
+            dominator, columns = dominance(unify(section, array))
+            manifest[section]["pareto"] = {
+                "columns": columns,
+                "dominator": dominator.tolist(),
+            }
+        _loaded.pop(section, None)
+
+    if update:
+        write_manifest(manifest)
+    return True
+
+
+def compile_all(force=False):
+    os.makedirs(CACHE, exist_ok=True)
+    manifest = read_manifest()
+    compiled = [
+        section
+        for section in sorted(os.listdir(SECTIONS))
+        if section.endswith(".csv") and compile_catalog(section, manifest, force)
+    ]
+    write_manifest(manifest)
+    return compiled
+
+
+def load(section):
+    """
+    Read-only memory-mapped structured array of one catalog, compiled on first
+    use or when the CSV changed
+    """
+    stat = os.stat(os.path.join(SECTIONS, section))
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _loaded.get(section)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    compile_catalog(section)
+    array = np.load(
+        os.path.join(CACHE, os.path.splitext(section)[0] + ".npy"),
+        mmap_mode="r",
+        allow_pickle=False,
+    )
+    _loaded[section] = (key, array)
+    return array
+
+
+def units(section):
+    load(section)
+    return read_manifest()[section]["units"]
+
+
+def dataframe(section):
+    # DataFrame of one catalog, index from 1 as in the section tables
+    df = pd.DataFrame(np.asarray(load(section)))
+    df.index = np.arange(1, len(df) + 1)
+    return df
+
+
+# =========================================================================================
+# Unified section catalog
+
+# Every family maps to these columns, lengths in mm so that stresses in MPa give
+# forces in N and moments in N-mm. Columns a family has no value for are NaN.
+SCHEMA = {
+    "H": "mm",  # depth, leg of angles, D of pipes
+    "B": "mm",  # width, 1st flange of Z
+    "B2": "mm",  # 2nd flange of Z
+    "tw": "mm",  # web thickness
+    "tf": "mm",  # flange thickness
+    "t": "mm",  # wall thickness of angles, tubes, pipes and cold-formed shapes
+    "d": "mm",  # lip
+    "r1": "mm",
+    "r2": "mm",
+    "A": "mm2",
+    "W": "kg/m",
+    "Cx": "mm",  # centroid
+    "Cy": "mm",
+    "xs": "mm",  # shear centre
+    "ys": "mm",
+    "Ix": "mm4",
+    "Iy": "mm4",
+    "Iu": "mm4",  # principal axes of angles
+    "Iv": "mm4",
+    "Sx": "mm3",  # elastic section modulus
+    "Sy": "mm3",
+    "Zx": "mm3",  # plastic section modulus
+    "Zy": "mm3",
+    "rx": "mm",
+    "ry": "mm",
+    "ru": "mm",
+    "rv": "mm",
+    "Fy": "MPa",
+    "E": "MPa",
+}
+
+# Derived from the schema columns for every row by derive(), NaN for families
+# without a formula in tools/section_properties and tools/torsion_props
+DERIVED = {
+    "h0": "mm",  # distance between flange centroids
+    "J": "mm4",  # torsional constant
+    "Cw": "mm6",  # warping constant
+    "c": "-",  # LTB factor c, 1 for H
+    "rts": "mm",  # effective radius of gyration for LTB
+    "Sxc": "mm3",  # elastic modulus to the compression flange
+}
+
+MM, CM, CM2, CM3, CM4 = 1.0, 10.0, 1e2, 1e3, 1e4
+KSC = 0.0980665  # kg/cm2 to MPa
+
+# Columns shared by the angle tables
+_ANGLE = {
+    "x": ("H", MM),
+    "t": ("t", MM),
+    "r1": ("r1", MM),
+    "r2": ("r2", MM),
+    "A": ("A", CM2),
+    "wt": ("W", 1.0),
+    "Cx": ("Cx", CM),
+    "Cy": ("Cy", CM),
+    "Ix": ("Ix", CM4),
+    "Iy": ("Iy", CM4),
+    "rx": ("rx", CM),
+    "ry": ("ry", CM),
+    "Zx": ("Sx", CM3),
+    "Zy": ("Sy", CM3),
+}
+
+# Light lip channels, ix/iy are radii and Sx/Sy the shear centre
+_LIP_CHANNEL = {
+    "h": ("H", MM),
+    "b": ("B", MM),
+    "d": ("d", MM),
+    "t": ("t", MM),
+    "A": ("A", CM2),  # unit row of the double table says m2, values are cm2
+    "Wt": ("W", 1.0),
+    "Cx": ("Cx", CM),
+    "Cy": ("Cy", CM),
+    "Ix": ("Ix", CM4),
+    "Iy": ("Iy", CM4),
+    "ix": ("rx", CM),
+    "iy": ("ry", CM),
+    "Zx": ("Sx", CM3),
+    "Zy": ("Sy", CM3),
+    "Sx": ("xs", CM),
+    "Sy": ("ys", CM),
+}
+
+_CHANNEL = {
+    "H": ("H", MM),
+    "B": ("B", MM),
+    "r1": ("r1", MM),
+    "r2": ("r2", MM),
+    "A": ("A", CM2),
+    "Cx": ("Cx", CM),
+    "Cy": ("Cy", CM),
+    "Ix": ("Ix", CM4),
+    "Iy": ("Iy", CM4),
+    "rx": ("rx", CM),
+    "ry": ("ry", CM),
+    "Zx": ("Sx", CM3),
+    "Zy": ("Sy", CM3),
+}
+
+_TUBE = {
+    "h": ("H", MM),
+    "b": ("B", MM),
+    "t": ("t", MM),
+    "Wt": ("W", 1.0),
+    "A": ("A", CM2),
+    "Ix": ("Ix", CM4),
+    "Iy": ("Iy", CM4),
+    "Zx": ("Sx", CM3),
+    "Zy": ("Sy", CM3),
+    "rx": ("rx", CM),
+    "ry": ("ry", CM),
+}
+
+"""
+Per CSV : family, designation format and column map {CSV column: (schema column,
+factor to the schema unit)}. The designation is formatted from the schema values
+and "name", the 1st CSV column, with the thicknesses added so that it is unique.
+The 1st CSV column is also an alias when it is unique in the table.
+Tables marked JIS give the elastic modulus as Zx, Zy, it goes to Sx, Sy.
+"""
+FAMILIES = {
+    "H-Sections.csv": {
+        "family": "H",
+        "designation": "{H:g}x{B:g}x{tw:g}x{tf:g}",
+        "columns": {
+            "H": ("H", MM),
+            "B": ("B", MM),
+            "tw": ("tw", MM),
+            "tf": ("tf", MM),
+            "r": ("r1", MM),
+            "A": ("A", CM2),
+            "Wt": ("W", 1.0),
+            "Ix": ("Ix", CM4),
+            "Iy": ("Iy", CM4),
+            "rx": ("rx", CM),
+            "ry": ("ry", CM),
+            "Sx": ("Sx", CM3),
+            "Sy": ("Sy", CM3),
+            "Zx": ("Zx", CM3),
+            "Zy": ("Zy", CM3),
+        },
+    },
+    # JIS, tf is the web (t1) and tw the flange (t2)
+    "Channels.csv": {
+        "family": "C",
+        "designation": "{name}x{tw:g}x{tf:g}",
+        "columns": {**_CHANNEL, "tf": ("tw", MM), "tw": ("tf", MM), "Wt": ("W", 1.0)},
+    },
+    "Double-Channel.csv": {
+        "family": "2C",
+        "designation": "2C-{H:g}x{B:g}x{tw:g}x{tf:g}",
+        "alias": False,  # 1st column is H
+        "columns": {**_CHANNEL, "t1": ("tw", MM), "t2": ("tf", MM), "wt": ("W", 1.0)},
+    },
+    # JIS, ix/iy are the principal Iu/Iv
+    "Equal_Angles.csv": {
+        "family": "L",
+        "designation": "{name}x{t:g}",
+        "columns": {
+            **_ANGLE,
+            "ix": ("Iu", CM4),
+            "iy": ("Iv", CM4),
+            "ru": ("ru", CM),
+            "rv": ("rv", CM),
+        },
+    },
+    "Double-Equal_Angles.csv": {
+        "family": "2L",
+        "designation": "2L-{name}x{t:g}",
+        "columns": _ANGLE,
+    },
+    "Light_Lip_Channel.csv": {
+        "family": "LC",
+        "designation": "{name}x{t:g}",
+        "columns": _LIP_CHANNEL,
+    },
+    "Double_Light_Lip_Channel.csv": {
+        "family": "2LC",
+        "designation": "{name}x{t:g}",
+        "columns": _LIP_CHANNEL,
+    },
+    "Pipe.csv": {
+        "family": "O",
+        "designation": "{H:g}x{t:g}",
+        "columns": {
+            "D": ("H", MM),
+            "t": ("t", MM),
+            "W": ("W", 1.0),
+            "A": ("A", CM2),
+            "I": ("Ix", CM4),
+            "Z": ("Sx", CM3),
+            "i": ("rx", CM),
+        },
+        "symmetric": True,
+    },
+    "Rectangular_Tube.csv": {
+        "family": "RT",
+        "designation": "{name}x{t:g}",
+        "columns": _TUBE,
+    },
+    "Square_Tube.csv": {
+        "family": "ST",
+        "designation": "{name}x{t:g}",
+        "columns": _TUBE,
+    },
+    "Z.csv": {
+        "family": "Z",
+        "designation": "{name}",
+        "columns": {
+            "h": ("H", MM),
+            "E": ("B", MM),
+            "F": ("B2", MM),
+            "L": ("d", MM),
+            "t": ("t", MM),
+            "wt": ("W", 1.0),
+            "A": ("A", CM2),
+            "Ix": ("Ix", CM4),
+            "Iy": ("Iy", CM4),
+            "Zx": ("Sx", CM3),
+            "Zy": ("Sy", CM3),
+            "rx": ("rx", CM),
+            "ry": ("ry", CM),
+            "Fy": ("Fy", KSC),
+            "Es": ("E", KSC),
+        },
+    },
+}
+FAMILIES["Double_Channel.csv"] = FAMILIES["Double-Channel.csv"]
+FAMILIES["Double_Equal_Angles.csv"] = FAMILIES["Double-Equal_Angles.csv"]
+
+
+def unify(section, raw):
+    """
+    Compiled catalog array to the unified schema, structured array of float64
+    """
+    spec = FAMILIES[section]
+    dtype = [(c, "f8") for c in {**SCHEMA, **DERIVED}]
+    data = np.full(len(raw), np.nan, dtype=dtype)
+    for column, (name, factor) in spec["columns"].items():
+        data[name] = np.asarray(raw[column], dtype=float) * factor
+
+    # Plates of constant thickness
+    for name in ("tw", "tf"):
+        fill = np.isnan(data[name])
+        data[name][fill] = data["t"][fill]
+    if spec.get("symmetric"):
+        for x, y in (("H", "B"), ("Ix", "Iy"), ("Sx", "Sy"), ("rx", "ry")):
+            data[y] = data[x]
+
+    derive(data, spec["family"])
+    return data
+
+
+def derive(data, family):
+    """
+    DERIVED columns of H, channels and single angles, in place
+    Same formulas as H.torsion, H.Rpc, CHN.torsion_chn and Torsion.angle
+    """
+    H, B, tw, tf, t = (data[name] for name in ("H", "B", "tw", "tf", "t"))
+    Iy, Sx = data["Iy"], data["Sx"]
+
+    if family == "H":
+        h0 = H - tf
+        data["h0"] = h0
+        data["J"] = (2 * B * tf**3 + h0 * tw**3) / 3
+        data["Cw"] = Iy * h0**2 / 4
+        data["c"] = 1.0
+        data["Sxc"] = (B * tf**3 / 12 + tf * B * (H / 2) ** 2) / (H / 2)
+    elif family == "C":
+        h0 = H - tf
+        q = (3 * B * tf + 2 * H * tw) / (6 * B * tf + H * tw)
+        data["h0"] = h0
+        data["J"] = (2 * B * tf**3 + H * tw**3) / 3
+        data["Cw"] = q * tf * B**3 * H**2 / 12
+        data["c"] = (h0 / 2) * np.sqrt(Iy / data["Cw"])
+        data["Sxc"] = Sx
+    elif family == "L":
+        data["J"] = 2 * H * t**3 / 3
+        data["Cw"] = 2 * H**3 * t**3 / 36
+    else:
+        return
+
+    if family in ("H", "C"):
+        data["rts"] = np.sqrt(np.sqrt(Iy * data["Cw"]) / Sx)
+
+
+# Capacity columns of the Pareto frontier, the elastic moduli for JIS tables
+PARETO = ("Zx", "Zy", "Ix")
+PARETO_JIS = ("Sx", "Sy", "Ix")
+
+
+def dominance(data):
+    """
+    Row i dominates row j when it is no heavier and no weaker in every PARETO
+    column, and better in one. Returns the lightest dominating row of every row,
+    -1 for Pareto-efficient rows, and the columns compared.
+    """
+    columns = list(PARETO if not np.isnan(data["Zx"]).all() else PARETO_JIS)
+    W = data["W"]
+    P = np.column_stack([data[name] for name in columns])  # (n, c)
+
+    # [i, j] : row i against row j, NaN never compares true
+    no_worse = (W[:, None] <= W[None, :]) & (P[:, None] >= P[None, :]).all(axis=2)
+    better = (W[:, None] < W[None, :]) | (P[:, None] > P[None, :]).any(axis=2)
+    dominates = no_worse & better
+
+    weight = np.where(dominates, W[:, None], np.inf)
+    dominator = np.where(dominates.any(axis=0), np.argmin(weight, axis=0), -1)
+    return dominator, columns
+
+
+# Columns kept in sorted order for lightest-section queries
+INDEXED = ("Zx", "Zy", "Sx", "Sy", "Ix", "Iy", "A", "W")
+
+
+def normalize(designation):
+    # Lookup key : no blanks, lower case, "200X100" and "200 x 100" are "200x100"
+    return "".join(str(designation).split()).lower()
+
+
+class SectionRow:
+    """
+    Lightweight view of one catalog row, nothing is copied
+    row.Zx, row["Zx"] : schema column in schema units
+    """
+
+    __slots__ = ("catalog", "index")
+
+    def __init__(self, catalog, index):
+        self.catalog = catalog
+        self.index = index
+
+    def __getattr__(self, name):
+        try:
+            return self.catalog.columns[name][self.index]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self.catalog.columns[name][self.index]
+
+    @property
+    def designation(self):
+        return self.catalog.designation[self.index]
+
+    def to_dict(self):
+        return {
+            name: column[self.index] for name, column in self.catalog.columns.items()
+        }
+
+    def __repr__(self):
+        return f"SectionRow({self.catalog.family} {self.designation})"
+
+
+class SectionCatalog:
+    """
+    One section table in the unified schema, see SCHEMA for columns and units
+    section : CSV file name in data/sections, e.g. "H-Sections.csv"
+
+    catalog["200x100x6x8"], catalog[k] : SectionRow by designation or row
+    catalog.column("Zx") : whole column, mm3
+    catalog.lightest(k, Zx=.., A=..) : k lightest rows meeting minimum values
+    catalog.pareto : rows no other section beats in W and all pareto_columns
+    catalog.limits(Fy, Es) : Lp, Lr of every row, kept per material
+    """
+
+    def __init__(self, section):
+        if section not in FAMILIES:
+            raise ValueError(
+                f"{section} is not a section table, use one of {', '.join(FAMILIES)}"
+            )
+        spec = FAMILIES[section]
+        self.section = section
+        self.family = spec["family"]
+
+        raw = load(section)
+        self.source = raw
+        self.data = unify(section, raw)
+        self.columns = {name: self.data[name] for name in self.data.dtype.names}
+
+        # Pareto frontier from compile time, dominated rows keep their lightest
+        # dominating row
+        pareto = read_manifest()[section]["pareto"]
+        self.pareto_columns = tuple(pareto["columns"])
+        self.dominator = np.array(pareto["dominator"], dtype=int)
+        self.pareto = np.flatnonzero(self.dominator < 0)
+
+        # Indexes of all rows and of the Pareto rows, weight rank of each row
+        self.sorted, self.by_weight = self.sort(np.arange(len(self.data)))
+        self.pareto_sorted, self.pareto_by_weight = self.sort(self.pareto)
+        self.rank = np.empty(len(self.data), dtype=int)
+        self.rank[self.by_weight] = np.arange(len(self.data))
+
+        # Lp, Lr of each material, see limits()
+        self._limits = {}
+
+        # Designations and hash index, the CSV name is kept as alias when unique
+        names = raw[raw.dtype.names[0]]
+        self.designation = np.array(
+            [
+                spec["designation"].format(name=name, **dict(zip(SCHEMA, row)))
+                for name, row in zip(names, self.data.tolist())
+            ]
+        )
+        self.index = {}
+        aliases = {}
+        for k, (designation, name) in enumerate(zip(self.designation, names)):
+            key = normalize(designation)
+            if key in self.index:
+                print(f"[WARN] {section} : duplicate section {designation}, row {k}")
+                continue
+            self.index[key] = k
+            if spec.get("alias", True):
+                aliases.setdefault(normalize(name), []).append(k)
+        for key, rows in aliases.items():
+            if len(rows) == 1:
+                self.index.setdefault(key, rows[0])
+        self.ambiguous = {key: rows for key, rows in aliases.items() if len(rows) > 1}
+
+    @classmethod
+    def open(cls, section):
+        # Catalog of this process, rebuilt when the CSV was recompiled
+        cached = _catalogs.get(section)
+        if cached is not None and cached.source is load(section):
+            return cached
+        catalog = _catalogs[section] = cls(section)
+        return catalog
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return (SectionRow(self, k) for k in range(len(self)))
+
+    def __contains__(self, designation):
+        return normalize(designation) in self.index
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return SectionRow(self, range(len(self))[key])
+        return SectionRow(self, self.lookup(key))
+
+    def lookup(self, designation):
+        """
+        Row of a designation, O(1)
+        """
+        key = normalize(designation)
+        try:
+            return self.index[key]
+        except KeyError:
+            if key in self.ambiguous:
+                options = ", ".join(self.designation[self.ambiguous[key]])
+                raise KeyError(f"{designation} is ambiguous, use one of {options}")
+            raise KeyError(f"{designation} not in {self.section}") from None
+
+    def column(self, name):
+        return self.columns[name]
+
+    def rows(self, selection):
+        # Row views of a boolean mask or row numbers
+        selection = np.asarray(selection)
+        if selection.dtype == bool:
+            selection = np.flatnonzero(selection)
+        return [SectionRow(self, int(k)) for k in selection]
+
+    def limits(self, Fy, Es):
+        """
+        LTB limits Lp, Lr (mm) of every row for one material, Fy, Es in MPa
+        As LTB.hc_major, computed once per material and kept
+        """
+        key = (float(Fy), float(Es))
+        if key not in self._limits:
+            col = self.columns
+            K1 = col["J"] * col["c"] / (col["Sx"] * col["h0"])
+            Lp = 1.76 * col["ry"] * np.sqrt(Es / Fy)
+            Lr = (
+                1.95
+                * col["rts"]
+                * (Es / (0.7 * Fy))
+                * np.sqrt(K1 + np.sqrt(K1**2 + 6.76 * (0.7 * Fy / Es) ** 2))
+            )
+            self._limits[key] = (Lp, Lr)
+        return self._limits[key]
+
+    def sort(self, rows):
+        """
+        Sort order over rows of each indexed column with values, the values as
+        lists for bisect, and the rows from the lightest (no weight last)
+        """
+        indexes = {}
+        for name in INDEXED:
+            column = self.columns[name]
+            valid = rows[~np.isnan(column[rows])]
+            if len(valid):
+                order = valid[np.argsort(column[valid], kind="stable")]
+                indexes[name] = (column[order].tolist(), order)
+        return indexes, rows[np.argsort(self.columns["W"][rows], kind="stable")]
+
+    def search(self, minimums, pareto=False):
+        """
+        Indexes and weight order to search, of the Pareto rows if pareto
+        The lightest section is then still found if minimums only bound
+        pareto_columns, the next k-1 are the lightest efficient ones.
+        """
+        if not pareto:
+            return self.sorted, self.by_weight
+        for name in minimums:
+            if name not in self.pareto_columns:
+                raise ValueError(
+                    f"Pareto rows of {self.section} are only optimal for "
+                    f"{', '.join(self.pareto_columns)}, not {name}"
+                )
+        return self.pareto_sorted, self.pareto_by_weight
+
+    def indexed(self, name, indexes=None):
+        try:
+            return (self.sorted if indexes is None else indexes)[name]
+        except KeyError:
+            if name not in INDEXED:
+                raise KeyError(f"{name} is not indexed, use one of {INDEXED}")
+            raise KeyError(f"{self.section} has no {name} values") from None
+
+    def lightest(self, k=1, pareto=False, **minimums):
+        """
+        Rows of the k lightest sections with column >= value for every keyword,
+        lightest first, e.g. lightest(5, Zx=5e5, Zy=1e5, A=4e3) in schema units
+        Each column is bisected, the shortest tail is then scanned for the others.
+        pareto : search the Pareto rows only, see search()
+        """
+        indexes, by_weight = self.search(minimums, pareto)
+        tail, first = None, None
+        for name, value in minimums.items():
+            values, order = self.indexed(name, indexes)
+            start = bisect.bisect_left(values, value)
+            if tail is None or len(order) - start < len(tail):
+                tail, first = order[start:], name
+        if tail is None:
+            return by_weight[:k]
+
+        ok = np.ones(len(tail), dtype=bool)
+        for name, value in minimums.items():
+            if name != first:
+                ok &= self.columns[name][tail] >= value
+        rows = tail[ok]
+        return rows[np.argsort(self.rank[rows], kind="stable")[:k]]
+
+    def lightest_batch(self, k=1, pareto=False, **minimums):
+        """
+        lightest() for q requirement sets at once, minimums : (q,) arrays
+        Returns (q, k) rows, -1 where fewer than k sections pass
+        """
+        indexes, by_weight = self.search(minimums, pareto)
+        values = {
+            name: np.atleast_1d(np.asarray(value, dtype=float))
+            for name, value in minimums.items()
+        }
+        q = max((len(v) for v in values.values()), default=1)
+        ok = np.ones((q, len(by_weight)), dtype=bool)  # columns in weight order
+        for name, value in values.items():
+            self.indexed(name, indexes)
+            column = self.columns[name][by_weight]
+            ok &= column[None, :] >= value[:, None]
+
+        # Stable sort puts the passing sections first, still lightest first
+        k = min(k, len(by_weight))
+        position = np.argsort(~ok, axis=1, kind="stable")[:, :k]
+        rows = by_weight[position]
+        rows[~np.take_along_axis(ok, position, axis=1)] = -1
+        return rows
+
+    def dataframe(self, columns=None):
+        """
+        DataFrame in schema units, index is the designation, all-NaN columns dropped
+        """
+        df = pd.DataFrame(self.data, index=pd.Index(self.designation, name="section"))
+        return df[columns] if columns is not None else df.dropna(axis=1, how="all")
+
+
+# Opened SectionCatalog of this process
+_catalogs = {}
+
+
+if __name__ == "__main__":
+    from absl import app, flags
+    from absl.flags import FLAGS
+
+    flags.DEFINE_boolean("force", False, "compile every catalog")
+
+    def main(_args):
+        compiled = compile_all(FLAGS.force)
+        print(f"[INFO] Compiled {len(compiled)} catalogs to {CACHE}")
+        for section in compiled:
+            print(f"    {section}")
+
+    app.run(main)
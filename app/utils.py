@@ -4,6 +4,11 @@ import numpy as np
 import pandas as pd
 from tabulate import tabulate
 
+try:
+    from app import catalog
+except ImportError:  # run from app/, repo root not on sys.path
+    import catalog
+
 CURR = os.getcwd()
 
 
@@ -54,18 +59,22 @@ def get_valid_list_input(prompt, N):
             )
 
 
-def df_generator(section):
-    # Dataframe of steel section
-    df = pd.read_csv(os.path.join(CURR, "data/sections", section))
+def xi_coordinate(spans):
+    # Local x coordinate of each span for diagrams
+    numS = 1000
+    Xt = [np.linspace(0, span, numS) for span in spans]
+    return numS, Xt
 
-    # Drop the unit row (2nd row)
-    df = df.iloc[1:]
 
-    # Convert numeric columns to numbers
-    numeric_columns = df.columns[1:]  # Exclude the first column
-    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors="coerce")
+def df_generator(section):
+    # Dataframe of steel section, index from 1
+    # Compiled catalog : unit row and text already handled, memory-mapped
+    return catalog.dataframe(section)
 
-    return df
+
+def section_generator(section):
+    # Dataframe of steel section, index from 0
+    return catalog.dataframe(section).reset_index(drop=True)
 
 
 def display_df(df, index=False):
@@ -111,8 +120,11 @@ def initialize_section(loads, materials, section):
     print(f"\nInitial Z required = {Zx:.2f} cm3")
     print(f"Initial A required = {(loads.Pu /  materials.Fy) * 10:.2f} cm2")
 
-    df_filter = df[(df["Zx"] > Zx) & (df["Zy"] > Zy)]
-    display_df(df_filter.sort_values(by=["Zx"])[:20], index=True)
+    # 20 lightest sections from the catalog indexes, table Zx is Sx for JIS tables
+    sections = catalog.SectionCatalog.open(section)
+    x, y = ("Zx", "Zy") if "Zx" in sections.sorted else ("Sx", "Sy")
+    rows = sections.lightest(20, **{x: Zx * 1e3, y: Zy * 1e3})  # mm3
+    display_df(df.iloc[rows], index=True)
     return df
 
 
@@ -134,8 +146,8 @@ def try_pipe(loads, materials, section):
     print(f"\nInitial Z required = {Zx:.2f} cm3")
     print(f"Initial A required = {(loads.Pu /  materials.Fy) * 10:.2f} cm2")
 
-    df_filter = df[(df["Z"] > Zx) & (df["Z"] > Zy)]
-    display_df(df_filter.sort_values(by=["Z"])[:20], index=True)
+    rows = catalog.SectionCatalog.open(section).lightest(20, Sx=max(Zx, Zy) * 1e3)
+    display_df(df.iloc[rows], index=True)
 
     # Try section
     i = get_valid_integer("PLEASE SELECT SECTION : ")
@@ -32,26 +32,36 @@ class Compression:
         )
         return d
 
-    # 4.4 flexural control
-    def flexural_control(self, d):
-        Fe = (np.pi**2) * self.Es / d**2  # Mpa
-        λc = np.sqrt(self.Fy / Fe)
-
-        a = 4.71 * np.sqrt(self.Es / self.Fy)
+    # 'L' : effective slenderness of single angles, Lb in m, r in cm
+    def angle_slenderness(self, Lb, r):
+        Lr = np.asarray(Lb, dtype=float) * 100 / np.asarray(r, dtype=float)
+        return np.floor(np.where(Lr <= 80, 72 + 0.75 * Lr, 32 + 1.25 * Lr))
+
+    # 4.4 flexural buckling stress, d = KL/r, scalar or array
+    def critical_stress(self, d):
+        Fe = (np.pi**2) * self.Es / np.asarray(d, dtype=float) ** 2  # Mpa
         b = self.Fy / Fe
 
-        # Elastic Failure
-        if d > a or b <= 2.25:
-            Fcr = min(0.877 * Fe, self.Fy)  # Mpa
-
-        # Inelastic Failure
-        else:
-            Fcr = self.Fy * 0.658 ** (λc**2)  # Mpa
+        # Inelastic Failure : d <= 4.71 sqrt(Es/Fy), Elastic Failure otherwise
+        return np.where(b <= 2.25, self.Fy * 0.658**b, 0.877 * Fe)  # Mpa
 
+    # 4.4 flexural control
+    def flexural_control(self, d):
+        Fcr = float(self.critical_stress(d))  # Mpa
         print(f"Flexural control, Fcr : {Fcr:.2f} MPa")
 
         return Fcr
 
+    def angle_capacity(self, Lb, r, A):
+        """
+        Label 3 over a whole angle table at once, no prints
+        Lb : unbraced length, m, r : radius of gyration, cm, A : area, cm2
+        Returns øPn (kN) and KL/r, broadcast over Lb, r, A
+        """
+        d = self.angle_slenderness(Lb, r)
+        øPn = self.øc * self.critical_stress(d) * np.asarray(A, dtype=float) / 10
+        return øPn, d
+
     # 4.5
     def flexural_torsional_control(self, Fcry, Fcrz, H):
         Fft = Fcry + Fcrz
@@ -80,11 +90,7 @@ class Compression:
 
         # 'L'
         if label == 3:
-            if Lb / r < 80:
-                d = np.floor(72 + 0.75 * (Lb / r))
-
-            if (Lb / r > 80) and (Lb / r < 200):
-                d = np.floor(32 + 1.25 * (Lb / r))
+            d = float(self.angle_slenderness(Lb, r))
 
             (
                 print(f"KL/r = {d:.2f} < {limit} : OK")
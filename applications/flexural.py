@@ -241,6 +241,36 @@ class LTB:
         print(f"Lateral-torsional bulking control, øMcr : {øMn:.2f} kN-m")
         return øMn  # kN-m
 
+    # 5.2.2 over every row of a SectionCatalog (H, C), no prints
+    def hc_major_catalog(self, catalog, Lb, Cb=1):
+        """
+        catalog : SectionCatalog, mm units, J, Cw, rts, h0, c are derived columns
+        and Lp, Lr are kept per material by the catalog
+        Lb : m
+        Returns øMn (kN-m) of every row, NaN where the columns are not derived
+        """
+        Lb = Lb * 1e3  # mm
+        col = catalog.column
+        Sx = col("Sx")  # mm3
+        Zx = np.where(np.isnan(col("Zx")), Sx, col("Zx"))  # JIS : elastic
+        Mp = self.Fy * Zx  # N-mm
+        Lp, Lr = catalog.limits(self.Fy, self.Es)  # mm
+
+        K1 = col("J") * col("c") / (Sx * col("h0"))
+        K2 = (Lb / col("rts")) ** 2
+        Fcr = (Cb * self.Es * np.pi**2) * (np.sqrt(1 + 0.078 * K1 * K2)) / K2  # MPa
+
+        Mn = np.where(
+            Lb <= Lp,
+            Mp,
+            np.where(
+                Lb <= Lr,
+                Cb * (Mp - (Mp - 0.7 * self.Fy * Sx) * (Lb - Lp) / (Lr - Lp)),
+                Fcr * Sx,
+            ),
+        )  # N-mm
+        return 0.9 * np.minimum(Mn, Mp) * 1e-6  # kN-m
+
     # 5.4.2
     # H : Major axis, NC-Web --> Yc, Yt, LTB, FLB, TFY
     def nc_web(self, section, Lb, Sxc, Iyc, Myc, Rpc, Cb=1):  # m, _unit in table